@@ -1,14 +1,18 @@
 import asyncio
-import json
+import atexit
 import logging
+import multiprocessing
+import multiprocessing.connection
+import os
 import queue
+import random
 import threading
 import uuid
 
 import zmq
 import zmq.asyncio
 
-from .json_rpc import JSONRPCResponseManager
+from .json_rpc import JSONRPCResponseManager, json_dumps, json_dumps_bytes, json_loads
 from .logging_setup import PPrintForLogging as ppfl
 
 logger = logging.getLogger(__name__)
@@ -68,7 +72,22 @@ class CommJsonRpcError(RuntimeError):
         return f"CommJsonRpcError('{self.message}', {self.error_code}, '{self.error_type}')"
 
 
-def format_jsonrpc_msg(method, params=None, *, notification=False):
+# The object is placed in the message buffers to wake up the threads when they need to be stopped.
+_stop_sentinel = object()
+
+
+def _join_threads(threads, *, timeout=1):
+    """
+    Wait for the threads to exit. The current thread is skipped (e.g. if ``stop()``
+    is called from a message handler).
+    """
+    current_thread = threading.current_thread()
+    for th in threads:
+        if (th is not None) and (th is not current_thread):
+            th.join(timeout=timeout)
+
+
+def format_jsonrpc_msg(method, params=None, *, notification=False, msg_id=None):
     """
     Returns dictionary that contains JSON RPC message.
 
@@ -80,12 +99,14 @@ def format_jsonrpc_msg(method, params=None, *, notification=False):
         List of args or dictionary of kwargs.
     notification: boolean
         If the message is notification, no response will be expected.
+    msg_id: int, str or None
+        Message ID. If *None*, then a new UUID is generated. Ignored for notifications.
     """
     msg = {"method": method, "jsonrpc": "2.0"}
     if params is not None:
         msg["params"] = params
     if not notification:
-        msg["id"] = str(uuid.uuid4())
+        msg["id"] = msg_id if (msg_id is not None) else str(uuid.uuid4())
     return msg
 
 
@@ -101,7 +122,8 @@ class PipeJsonRpcReceive:
     use_json: boolean
         If *True*, the messages are expected to be in encoded as JSON. Otherwise the messages
         are expected to be binary. The parameter also enables/disables JSON encoding of
-        response messages.
+        response messages. Binary messages (Python objects) are sent over the pipe without
+        additional encoding, which is substantially faster. Default: *False*.
     name: str
         Name of the receiving thread (it is better to assign meaningful unique names to threads.
 
@@ -111,7 +133,7 @@ class PipeJsonRpcReceive:
     .. code-block:: python
 
         conn1, conn2 = multiprocessing.Pipe()
-        pc = PipeJsonRPC(conn=conn1, use_json=True, name="RE QServer Receive")
+        pc = PipeJsonRPC(conn=conn1, name="RE QServer Receive")
 
         def func():
             print("Testing")
@@ -122,10 +144,18 @@ class PipeJsonRpcReceive:
         pc.stop()  # Stop before exit to stop the thread.
     """
 
-    def __init__(self, conn, *, use_json=True, name="RE QServer Comm"):
+    def __init__(self, conn, *, use_json=False, name="RE QServer Comm"):
         self._conn = conn
         self._response_manager = JSONRPCResponseManager(use_json=use_json)
-        self._thread_running = False  # Set True to exit the thread
+
+        # The event is set when the threads are requested to stop (or not running).
+        self._stop_event = threading.Event()
+        self._stop_event.set()
+        self._thread_conn, self._thread_proc = None, None
+
+        # The pipe used to wake up the receiving thread when the thread needs to be stopped.
+        #   A new pipe is created each time the thread is started and closed when it is stopped.
+        self._wakeup_r, self._wakeup_w = None, None
 
         self._thread_name = name
 
@@ -161,9 +191,27 @@ class PipeJsonRpcReceive:
 
     def stop(self):
         """
-        Stop processing of the pipe messages (and exit the tread)
+        Stop processing of the pipe messages (and exit the tread). The function
+        waits for the threads to exit.
         """
-        self._thread_running = False
+        if self._stop_event.is_set():
+            return
+        self._stop_event.set()
+
+        # Wake up the threads
+        self._wakeup_w.send(None)
+        try:
+            self._msg_recv_buffer.put(_stop_sentinel, block=False)
+        except queue.Full:
+            pass
+
+        _join_threads([self._thread_conn, self._thread_proc])
+
+        # Close the wakeup pipe unless the receiving thread is still using it (failed to exit).
+        if not self._thread_conn.is_alive():
+            self._wakeup_r.close()
+            self._wakeup_w.close()
+            self._wakeup_r, self._wakeup_w = None, None
 
     def __del__(self):
         self.stop()
@@ -183,12 +231,13 @@ class PipeJsonRpcReceive:
         self._response_manager.add_method(handler, name)
 
     def _start_conn_thread(self):
-        if not self._thread_running:
+        if self._stop_event.is_set():
             # Clear the pipe from outdated unprocessed messages.
             while self._conn.poll():
                 self._conn.recv()
 
-            self._thread_running = True
+            self._stop_event.clear()
+            self._wakeup_r, self._wakeup_w = multiprocessing.Pipe(duplex=False)
 
             self._thread_proc = threading.Thread(
                 target=self._process_msg_thread, name=self._thread_name + " P", daemon=True
@@ -196,17 +245,29 @@ class PipeJsonRpcReceive:
             self._thread_proc.start()
 
             self._thread_conn = threading.Thread(
-                target=self._receive_conn_thread, name=self._thread_name + " R", daemon=True
+                target=self._receive_conn_thread,
+                args=(self._wakeup_r,),
+                name=self._thread_name + " R",
+                daemon=True,
             )
             self._thread_conn.start()
 
-    def _receive_conn_thread(self):
+    def _receive_conn_thread(self, wakeup_r):
+        # Attributes used in the loop are cached as local variables
+        conn, wait, buffer_put = self._conn, multiprocessing.connection.wait, self._msg_recv_buffer.put
+        conn_list, stop_event = [conn, wakeup_r], self._stop_event
         msg = None
         while True:
-            if self._conn.poll(self._conn_polling_timeout):
+            # Block until a message is received or the thread is stopped.
+            ready = wait(conn_list)
+            if conn in ready:
                 try:
-                    msg = self._conn.recv()
-                    self._msg_recv_buffer.put(msg, block=False)
+                    # Receive all messages available in the pipe before waiting again.
+                    while True:
+                        msg = conn.recv()
+                        buffer_put(msg, block=False)
+                        if not conn.poll(0):
+                            break
                 except queue.Full:
                     # There is a major malfunction with the worker if you are here ...
                     logger.warning(
@@ -220,23 +281,27 @@ class PipeJsonRpcReceive:
                         "Exception occurred while waiting for a message or receiving a message: %s", ex
                     )
                     break
-            if not self._thread_running:  # Exit thread
+            if (wakeup_r in ready) or stop_event.is_set():  # Exit thread
                 break
 
     def _process_msg_thread(self):
         """
         Process messages held in the buffer
         """
+        # Attributes used in the loop are cached as local variables
+        buffer_get, timeout, handle_msg = self._msg_recv_buffer.get, self._conn_polling_timeout, self._handle_msg
+        stop_event = self._stop_event
         while True:
             msg = None
             try:
-                msg = self._msg_recv_buffer.get(timeout=self._conn_polling_timeout)
-                self._handle_msg(msg)
+                msg = buffer_get(timeout=timeout)
+                if msg is not _stop_sentinel:
+                    handle_msg(msg)
             except queue.Empty:
                 pass
             except Exception as ex:
                 logger.exception("Exception occurred while processing the message %s: %s", msg, ex)
-            if not self._thread_running:  # Exit thread
+            if stop_event.is_set():  # Exit thread
                 break
 
     def _handle_msg(self, msg):
@@ -255,9 +320,9 @@ class PipeJsonRpcSendAsync:
     """
     The class contains functions for supporting asyncio-based client for JSON RPC comminucation
     using interprocess communication pipe. The class object must be created on the loop (from one of
-    `async` functions). This implementation allows calls only to one method at a time. Multiple
-    `send_msg` requests may be put on the loop, but the next message is never sent before
-    the response to the previous message is received or timeout occurred.
+    `async` functions). Multiple `send_msg` requests may be put on the loop. The messages are sent
+    without waiting for the responses to the previous messages. The responses are matched
+    to the requests by message ID. Multiple requests may also be sent as a batch (`send_batch`).
 
     Parameters
     ----------
@@ -267,7 +332,8 @@ class PipeJsonRpcSendAsync:
         Default value of timeout: maximum time to wait for response after a message is sent
     use_json: boolean
         Enables/disables encoding of the outgoing messages as JSON. If *True*, then the response
-        messages are also expected to be encoded as JSON. Otherwise the messages are binary.
+        messages are also expected to be encoded as JSON. Otherwise the messages are binary
+        (Python objects are sent over the pipe without additional encoding). Default: *False*.
     name: str
         Name of the receiving thread (it is better to assign meaningful unique names to threads.
 
@@ -280,7 +346,7 @@ class PipeJsonRpcSendAsync:
 
         async def send_messages():
             # Must be instantiated and used within the loop
-            p_send = PipeJsonRpcSendAsync(conn=conn1, use_json=True, name="comm-client")
+            p_send = PipeJsonRpcSendAsync(conn=conn1, name="comm-client")
             p_send.start()
 
             method = "method_name"
@@ -293,7 +359,7 @@ class PipeJsonRpcSendAsync:
         pc.stop()
 
 
-        pc = PipeJsonRpcSendAsync(conn=conn1, use_json=True, name="RE QServer Receive")
+        pc = PipeJsonRpcSendAsync(conn=conn1, name="RE QServer Receive")
 
         def func():
             print("Testing")
@@ -305,61 +371,118 @@ class PipeJsonRpcSendAsync:
 
     """
 
-    def __init__(self, conn, *, timeout=0.5, use_json=True, name="RE QServer Comm"):
+    def __init__(self, conn, *, timeout=0.5, use_json=False, name="RE QServer Comm"):
         self._conn = conn
         self._loop = asyncio.get_running_loop()
         self._use_json = use_json
 
         self._thread_name = name
 
-        self._fut_recv = None  # Future for waiting for incoming messages
-        # Lock that prevents sending of the next message before response
-        #   to the previous message is received.
-        self._lock_comm = asyncio.Lock()
         self._timeout_comm = timeout  # Timeout (time to wait for response to a message)
 
-        # Polling timeout for the pipe. The data will be read from the pipe instantly once it is available.
-        #   The timeout determines how long it would take to stop the thread when needed.
+        # Polling timeout for the outgoing message buffer.
         self._conn_polling_timeout = 0.1
 
         # Buffer for moving outgoing messages to the background thread which sends the messages
-        self._msg_send_buffer = queue.Queue(maxsize=1)
+        self._msg_send_buffer_size = 100
+        self._msg_send_buffer = queue.Queue(maxsize=self._msg_send_buffer_size)
+
+        # The event is set when the 'send' thread is requested to stop (or not running).
+        self._stop_event = threading.Event()
+        self._stop_event.set()
+        self._pipe_send_thread = None
+        self._reader_registered = False  # True - the pipe is monitored by the event loop
 
-        self._thread_running = False  # True - thread is running
+        # Futures for the messages waiting for responses: {<message ID>: <future>}. The received
+        #   messages that don't have matching ID or no ID are ignored.
+        self._pending = {}
 
-        # Expected ID of the received message. The ID must be the same as the ID of the sent message.
-        #   Ignore all message that don't have matching ID or no ID.
-        self._expected_msg_id = None
+        # Counter used to generate message IDs. IDs only need to be unique for the messages sent
+        #   over the pipe. The initial value is random, so that stale responses to the messages
+        #   sent by a different instance (e.g. before the manager is restarted) are not accepted.
+        self._msg_counter = random.getrandbits(32)
 
     def start(self):
         """
         Start processing of the pipe messages
         """
+        # Incoming messages are read from the pipe by the event loop as soon as they are available.
+        if not self._reader_registered:
+            self._loop.add_reader(self._conn.fileno(), self._on_readable)
+            self._reader_registered = True
         self._start_conn_thread()
 
     def stop(self):
         """
         Stop processing of the pipe messages (and exit the tread)
         """
-        self._thread_running = False
+        if self._reader_registered:
+            self._loop.remove_reader(self._conn.fileno())
+            self._reader_registered = False
+
+        if self._stop_event.is_set():
+            return
+        self._stop_event.set()
+
+        # Wake up the thread
+        try:
+            self._msg_send_buffer.put((_stop_sentinel, None), block=False)
+        except queue.Full:
+            pass
+
+        _join_threads([self._pipe_send_thread])
 
     def __del__(self):
         self.stop()
 
     def _start_conn_thread(self):
-        # Start 'receive' thread
-        if not self._thread_running:
-            self._thread_running = True
-            self._pipe_recv_thread = threading.Thread(
-                target=self._pipe_receive, name=self._thread_name + " R", daemon=True
-            )
+        # Start 'send' thread
+        if self._stop_event.is_set():
+            self._stop_event.clear()
             self._pipe_send_thread = threading.Thread(
                 target=self._pipe_send, name=self._thread_name + " S", daemon=True
             )
-
-            self._pipe_recv_thread.start()
             self._pipe_send_thread.start()
 
+    def _format_msg(self, method, params, *, notification):
+        if not notification:
+            self._msg_counter += 1
+        return format_jsonrpc_msg(method, params, notification=notification, msg_id=self._msg_counter)
+
+    def _process_response(self, msg, response):
+        """
+        Returns the result contained in the response or raises an exception.
+        """
+        if "result" in response:
+            return response["result"]
+        elif "error" in response:
+            # TODO: verify that this is all information that should be saved
+            err_code = response["error"]["code"]
+            if "data" in response["error"]:
+                # Server Error (issue with execution of the method)
+                err_type = response["error"]["data"]["type"]
+                # Message: "Server error: <message text>"
+                err_msg = f'{response["error"]["message"]}: {response["error"]["data"]["message"]}'
+            else:
+                # Other json-rpc errors
+                err_type = "CommJsonRpcError"
+                err_msg = response["error"]["message"]
+            raise CommJsonRpcError(err_msg, error_code=err_code, error_type=err_type)
+        else:
+            err_msg = f"Message {msg}\nresulted in response with unknown format: {response}"
+            raise RuntimeError(err_msg)
+
+    async def _send_to_pipe(self, msg, *, timeout):
+        """
+        Pass the message to the 'send' thread and wait until it is sent.
+        """
+        # 'fut_send' sent along with the message. If the thread is still sending the previous
+        #   messages, the future is not going to be set until the current message is sent.
+        #   The message is not sent if the future is cancelled due to timeout.
+        fut_send = self._loop.create_future()
+        self._msg_send_buffer.put((msg, fut_send), block=False)
+        await asyncio.wait_for(fut_send, timeout=timeout)
+
     async def send_msg(self, method, params=None, *, notification=False, timeout=None):
         """
         Send JSON RPC message to server and return the result of the function (method)
@@ -372,8 +495,9 @@ class PipeJsonRpcSendAsync:
         params: list or dict
             args or kwargs of the remote method
         notification: boolean
-            True - message is notification. The function returns immediately without
-            waiting of the response, which is never generated for notification.
+            True - message is notification. The function returns immediately after
+            the message is placed in the outgoing buffer without waiting for the message
+            to be sent. No response is generated for notification.
         timeout: float
             Timeout in seconds. The timeout is applied separately during sending and
             receiving message. If timeout is exceeded during sending message or receiving
@@ -398,134 +522,155 @@ class PipeJsonRpcSendAsync:
 
         The function will raise `CommTimeoutError` in case of communication timeout
         """
-        # The lock protects from sending the next message
-        #   before response to the previous message is received.
-
         if timeout is None:
             timeout = self._timeout_comm
 
-        async with self._lock_comm:
-            msg = format_jsonrpc_msg(method, params, notification=notification)
+        msg = self._format_msg(method, params, notification=notification)
 
+        if notification:
+            # Notifications (e.g. heartbeat) are passed to the 'send' thread without waiting
+            #   for the message to be sent. No response is expected.
             try:
-                # 'fut_send' sent along with the message. If the thread is still sending the previous
-                #   message, the future is not going to be set until the current message is sent.
-                fut_send = self._loop.create_future()
-                if not notification:
-                    # 'self._fut_recv' is set only when the response with the specific message UID is received.
-                    self._expected_msg_id = msg["id"]
-                    self._fut_recv = self._loop.create_future()
-
-                self._msg_send_buffer.put((msg, fut_send), block=False)  # Buffer is expected to be empty
-                await asyncio.wait_for(fut_send, timeout=timeout)
-                fut_send.result()
-
-                # No response is expected if this is a notification
-                if not notification:
-                    # Waiting for the future may raise 'asyncio.TimeoutError'
-                    await asyncio.wait_for(self._fut_recv, timeout=timeout)
-                    response = self._fut_recv.result()
-
-                    if "result" in response:
-                        return response["result"]
-                    elif "error" in response:
-                        # TODO: verify that this is all information that should be saved
-                        err_code = response["error"]["code"]
-                        if "data" in response["error"]:
-                            # Server Error (issue with execution of the method)
-                            err_type = response["error"]["data"]["type"]
-                            # Message: "Server error: <message text>"
-                            err_msg = f'{response["error"]["message"]}: {response["error"]["data"]["message"]}'
-                        else:
-                            # Other json-rpc errors
-                            err_type = "CommJsonRpcError"
-                            err_msg = response["error"]["message"]
-                        raise CommJsonRpcError(err_msg, error_code=err_code, error_type=err_type)
-                    else:
-                        err_msg = (
-                            f"Message {ppfl(msg)}\n" f"resulted in response with unknown format: {ppfl(response)}"
-                        )
-                        raise RuntimeError(err_msg)
-                else:
-                    response = None
-                return response
-
-            except asyncio.TimeoutError:
-                raise CommTimeoutError(f"Timeout while waiting for response to message: \n{ppfl(msg)}")
+                self._msg_send_buffer.put((msg, None), block=False)
             except queue.Full:
-                raise CommTimeoutError(f"The outgoing message buffer is full: \n{ppfl(msg)}")
-            finally:
-                # Clear the 'send' buffer
-                while not self._msg_send_buffer.empty():
-                    self._msg_send_buffer.get()
+                raise CommTimeoutError(f"The outgoing message buffer is full: \n{msg}")
+            return None
+
+        try:
+            # The future is set only when the response with the matching message ID is received.
+            fut_recv = self._loop.create_future()
+            self._pending[msg["id"]] = fut_recv
+
+            await self._send_to_pipe(msg, timeout=timeout)
+
+            # Waiting for the future may raise 'asyncio.TimeoutError'
+            await asyncio.wait_for(fut_recv, timeout=timeout)
+            return self._process_response(msg, fut_recv.result())
+
+        except asyncio.TimeoutError:
+            raise CommTimeoutError(f"Timeout while waiting for response to message: \n{msg}")
+        except queue.Full:
+            raise CommTimeoutError(f"The outgoing message buffer is full: \n{msg}")
+        finally:
+            self._pending.pop(msg["id"], None)
+
+    async def send_batch(self, messages, *, timeout=None):
+        """
+        Send a batch of JSON RPC messages to server and return the list of results. The messages
+        are sent as a single JSON RPC batch and processed by the server one by one. The function
+        waits for the responses to all messages in the batch.
+
+        Parameters
+        ----------
+        messages: list(tuple)
+            List of messages. Each message is represented by a tuple ``(method, params)``.
+        timeout: float
+            Timeout in seconds. The timeout is applied separately during sending the batch
+            and receiving all the responses.
+
+        Returns
+        -------
+        list
+            List of results in the same order as the messages in the batch.
+
+        Raises
+        ------
+        CommTimeoutError, CommJsonRpcError, RuntimeError
+            See ``send_msg``. If processing of multiple messages failed, the exception
+            is raised for the first failing message in the batch.
+        """
+        if timeout is None:
+            timeout = self._timeout_comm
+
+        msgs = [self._format_msg(method, params, notification=False) for method, params in messages]
+        if not msgs:
+            return []
 
-                self._fut_recv = None
-                self._expected_msg_id = None
+        futs_recv = [self._loop.create_future() for _ in msgs]
+        for msg, fut in zip(msgs, futs_recv):
+            self._pending[msg["id"]] = fut
 
-    async def _response_received(self, response):
+        try:
+            await self._send_to_pipe(msgs, timeout=timeout)
+            await asyncio.wait_for(asyncio.gather(*futs_recv), timeout=timeout)
+            return [self._process_response(msg, fut.result()) for msg, fut in zip(msgs, futs_recv)]
+
+        except asyncio.TimeoutError:
+            raise CommTimeoutError(f"Timeout while waiting for response to the batch of messages: \n{msgs}")
+        except queue.Full:
+            raise CommTimeoutError(f"The outgoing message buffer is full: \n{msgs}")
+        finally:
+            for msg in msgs:
+                self._pending.pop(msg["id"], None)
+
+    def _response_received(self, response):
         """
         Set the future with the results. Ignore all messages with unexpected or missing IDs.
         Also ignore all unexpected messages.
         """
-        if self._expected_msg_id is not None:
-            if "id" in response:
-                if response["id"] != self._expected_msg_id:
-                    # Incorrect ID: ignore the message.
-                    logger.error(
-                        "Received response with incorrect message ID: %s. Expected %s.\nMessage: %s",
-                        response["id"],
-                        self._expected_msg_id,
-                        ppfl(response),
-                    )
-                else:
-                    # Accept the message. Otherwise wait for timeout
-                    self._fut_recv.set_result(response)
-                    self._expected_msg_id = None
-            else:
-                # Missing ID: ignore the message
-                logger.error("Received response with missing message ID: %s", ppfl(response))
-        else:
+        if isinstance(response, list):
+            # Batch of responses
+            for single_response in response:
+                self._response_received(single_response)
+            return
+
+        if response.get("id", None) is None:
+            # Missing ID: ignore the message
+            logger.error("Received response with missing message ID: %s", ppfl(response))
+            return
+
+        fut_recv = self._pending.pop(response["id"], None)
+        if (fut_recv is None) or fut_recv.done():
             logger.error("Unexpected message received: %s. The message is ignored", ppfl(response))
+        else:
+            fut_recv.set_result(response)
 
-    def _conn_received(self, response):
-        asyncio.create_task(self._response_received(response))
-
-    async def _response_sent(self, response, fut_send):
+    def _conn_sent(self, response, fut_send):
+        # Called in the event loop. The future may already be cancelled due to timeout.
         if not fut_send.done():
             fut_send.set_result(True)  # The result value is not used
 
-    def _conn_sent(self, response, fut_send):
-        asyncio.create_task(self._response_sent(response, fut_send))
-
-    def _pipe_receive(self):
-        while True:
-            if self._conn.poll(self._conn_polling_timeout):
-                try:
-                    msg_json = self._conn.recv()
-                    msg = json.loads(msg_json) if self._use_json else msg_json
-                    # logger.debug("Message Watchdog->Manager received: '%s'", ppfl(msg))
-                    # Messages should be handled in the event loop
-                    self._loop.call_soon_threadsafe(self._conn_received, msg)
-                except EOFError:
-                    pass
-                except Exception as ex:
-                    logger.exception("Exception occurred while waiting for packet: %s", ex)
-            if not self._thread_running:  # Exit thread
-                break
+    def _on_readable(self):
+        """
+        Read the messages from the pipe. The callback is called by the event loop
+        when the pipe becomes readable. All messages available in the pipe are processed.
+        """
+        conn, use_json, response_received = self._conn, self._use_json, self._response_received
+        try:
+            while conn.poll():
+                msg_json = conn.recv()
+                msg = json_loads(msg_json) if use_json else msg_json
+                # logger.debug("Message Watchdog->Manager received: '%s'", ppfl(msg))
+                response_received(msg)
+        except EOFError:
+            # The other end of the pipe is closed. Stop monitoring the pipe, otherwise
+            #   the callback would be called continuously.
+            if self._reader_registered:
+                self._loop.remove_reader(self._conn.fileno())
+                self._reader_registered = False
+        except Exception as ex:
+            logger.exception("Exception occurred while waiting for packet: %s", ex)
 
     def _pipe_send(self):
+        # Attributes used in the loop are cached as local variables
+        conn, use_json, buffer_get = self._conn, self._use_json, self._msg_send_buffer.get
+        timeout, call_soon_threadsafe = self._conn_polling_timeout, self._loop.call_soon_threadsafe
+        stop_event = self._stop_event
         while True:
             msg = None
             try:
-                msg, fut_send = self._msg_send_buffer.get(timeout=self._conn_polling_timeout)
-                msg_json = json.dumps(msg) if self._use_json else msg
-                self._conn.send(msg_json)
-                self._loop.call_soon_threadsafe(self._conn_sent, msg, fut_send)
+                msg, fut_send = buffer_get(timeout=timeout)
+                # Skip the message if the timeout expired before the message was sent
+                if (msg is not _stop_sentinel) and not ((fut_send is not None) and fut_send.cancelled()):
+                    msg_json = json_dumps(msg) if use_json else msg
+                    conn.send(msg_json)
+                    if fut_send is not None:  # 'fut_send' is None for notifications
+                        call_soon_threadsafe(self._conn_sent, msg, fut_send)
             except queue.Empty:
                 pass
             except Exception as ex:
                 logger.exception("Exception occurred while sending the message %s: %s", ppfl(msg), ex)
-            if not self._thread_running:  # Exit thread
+            if stop_event.is_set():  # Exit thread
                 break
 
 
@@ -585,6 +730,33 @@ def validate_zmq_key(key):
 # =========================================================================================
 #                                    ZMQ communication
 
+# Options of the client sockets: the number of messages queued by the socket (the asynchronous
+#   client may have multiple messages in flight) and idle time (s) before TCP keepalive probes are sent.
+_zmq_socket_hwm = 64
+_zmq_tcp_keepalive_idle = 30
+
+
+def _set_zmq_client_socket_options(zmq_socket, zmq_server_address):
+    """
+    Set options of the client socket. The options are set before the socket is connected.
+    Note, that ZMQ disables Nagle's algorithm (sets ``TCP_NODELAY``) for TCP connections.
+    The ``IMMEDIATE`` option is not set: sending a message would block instead of
+    timing out if the server is not running.
+
+    Parameters
+    ----------
+    zmq_socket: zmq.Socket
+        Client socket.
+    zmq_server_address: str
+        Address of the server.
+    """
+    zmq_socket.setsockopt(zmq.SNDHWM, _zmq_socket_hwm)
+    zmq_socket.setsockopt(zmq.RCVHWM, _zmq_socket_hwm)
+    if zmq_server_address.startswith("tcp://"):
+        # Detect broken connections (e.g. if the server host is not available)
+        zmq_socket.setsockopt(zmq.TCP_KEEPALIVE, 1)
+        zmq_socket.setsockopt(zmq.TCP_KEEPALIVE_IDLE, _zmq_tcp_keepalive_idle)
+
 
 class ZMQCommSendThreads:
     """
@@ -646,6 +818,12 @@ class ZMQCommSendThreads:
             time.sleep(0.01)
 
         # Code to process received 'msg'
+
+        zmq_comm.close()
+
+        # The object may also be used as a context manager. The socket is closed on exit.
+        with ZMQCommSendThreads() as zmq_comm:
+            msg = zmq_comm.send_message(method="some_method", params={"some_value": n})
     """
 
     def __init__(
@@ -659,8 +837,8 @@ class ZMQCommSendThreads:
     ):
         zmq_server_address = zmq_server_address or default_zmq_control_address
 
-        # ZeroMQ communication
-        self._ctx = zmq.Context()
+        # ZeroMQ communication. The context is shared by all instances in the process.
+        self._ctx = zmq.Context.instance()
         self._zmq_socket = None
         self._zmq_server_address = zmq_server_address
 
@@ -692,7 +870,10 @@ class ZMQCommSendThreads:
         # Start the thread. The thread will poll the socket for incoming data.
         self._start_receive_thread()
 
-    def __del__(self):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
         self.close()
 
     def _receive_thread(self):
@@ -858,6 +1039,7 @@ class ZMQCommSendThreads:
         self._zmq_socket.SNDTIMEO = self._timeout_send
         # Clear the buffer quickly after the socket is closed
         self._zmq_socket.setsockopt(zmq.LINGER, 100)
+        _set_zmq_client_socket_options(self._zmq_socket, self._zmq_server_address)
 
         # Successful connection does not mean that the socket exists
         self._zmq_socket.connect(self._zmq_server_address)
@@ -948,8 +1130,10 @@ class ZMQCommSendThreads:
 
     def close(self):
         """
-        Close ZMQ socket. Call to close socket if the object is no longer needed, but may
-        not be destroyed for some time.
+        Close ZMQ socket. The socket is not closed automatically when the object is deleted:
+        call the function once the object is no longer needed or use the object as a context
+        manager. The ZMQ context is shared by all instances and is not terminated.
+        Call ``zmq.Context.instance().term()`` during process shutdown if needed.
         """
         if self._zmq_socket is not None:
             self._zmq_socket.close()
@@ -960,7 +1144,11 @@ class ZMQCommSendAsync:
     """
     API for communication with RE Manager via ZMQ. The object has to be created
     from the running even loop or the loop has to be passed as a parameter during
-    initialization.
+    initialization. Multiple ``send_message()`` requests may be awaited concurrently:
+    the requests are sent without waiting for responses to the previous requests.
+    The responses are matched to the requests by request ID, so a response is never returned
+    to a wrong request even if the server does not respond to some requests. A timeout of any
+    request restarts the socket and fails all the requests that are waiting for responses.
 
     Parameters
     ----------
@@ -999,6 +1187,15 @@ class ZMQCommSendAsync:
 
         asyncio.run(communicate())
 
+        # The object may also be used as an asynchronous context manager.
+        #   The socket is closed on exit.
+        async def communicate():
+            async with ZMQCommSendAsync() as zmq_comm:
+                msg = await zmq_comm.send_message(method="some_method", params={"some_value": 10})
+                print(f"msg={msg}")
+
+        asyncio.run(communicate())
+
     """
 
     def __init__(
@@ -1017,22 +1214,29 @@ class ZMQCommSendAsync:
         self._server_public_key = server_public_key
 
         self._timeout_receive = timeout_recv  # Timeout for 'recv' operation (ms)
-        self._timeout_receive_last = None  # Timeout used for last acquisition (ms)
         self._timeout_send = timeout_send  # Timeout for 'send' operation (ms)
         self._raise_exceptions = raise_exceptions
 
-        # ZeroMQ communication
-        self._ctx = zmq.asyncio.Context()
+        # ZeroMQ communication. The context is shared by all instances in the process.
+        self._ctx = zmq.asyncio.Context.instance()
         self._zmq_socket = None
         self._zmq_server_address = zmq_server_address
 
+        # Futures for the requests waiting for responses: {request_id: future}. The request ID is
+        #   sent in the envelope frame, which is returned by the server (REP socket) with the response.
+        self._pending = {}
+        self._request_counter = 0
+        self._zmq_receive_task = None  # The task is created when the first message is sent
+
         if self._server_public_key is not None:
             validate_zmq_key(self._server_public_key)
 
         self._zmq_socket_open()
-        self._lock_zmq = asyncio.Lock()
 
-    def __del__(self):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
         self.close()
 
     def get_loop(self):
@@ -1041,35 +1245,89 @@ class ZMQCommSendAsync:
         """
         return self._loop
 
-    async def _zmq_send(self, msg):
-        await self._zmq_socket.send_json(msg)
+    async def _zmq_send(self, request_id, msg):
+        # The request ID and the empty delimiter frame form the envelope, which is expected by
+        #   the REP socket of the server and returned with the response.
+        #   Messages shorter than 'copy_threshold' of the socket are still copied by 'pyzmq'.
+        await self._zmq_socket.send_multipart([request_id, b"", json_dumps_bytes(msg)], copy=False)
 
-    async def _zmq_receive(self, *, timeout):
-        try:
-            if await self._zmq_socket.poll(timeout=timeout):
-                msg = await self._zmq_socket.recv_json()
-            else:
-                # This is very likely a timeout (RE Manager is not responding)
-                raise Exception("timeout occurred")
-        except Exception as ex:
-            # Timeout occurred. Socket needs to be reset.
-            logger.exception("ZeroMQ communication failed: %s", ex)
-            raise
-        return msg
+    async def _zmq_receive_loop(self):
+        """
+        Receive responses from the server and set the futures of the pending requests.
+        The task is bound to the current socket and exits when the socket is closed.
+        """
+        zmq_socket, pending = self._zmq_socket, self._pending
+        while not zmq_socket.closed:
+            try:
+                frames = await zmq_socket.recv_multipart(copy=False)
+            except zmq.ZMQError:
+                if zmq_socket.closed:
+                    break
+                raise
+
+            # The response is expected to contain the envelope (request ID and empty delimiter).
+            request_id = frames[0].bytes if len(frames) == 3 else None
+            fut = pending.pop(request_id, None)
+            if fut is None:
+                logger.error("Unexpected message received (request ID: %r). The message is ignored", request_id)
+                continue
+
+            if not fut.done():
+                try:
+                    # The message is decoded directly from the buffer of the received frame.
+                    fut.set_result(json_loads(frames[-1].buffer))
+                except Exception as ex:
+                    fut.set_exception(ex)
+
+    def _start_receive_task(self):
+        if (self._zmq_receive_task is None) or self._zmq_receive_task.done():
+            self._zmq_receive_task = asyncio.ensure_future(self._zmq_receive_loop())
+
+    def _stop_receive_task(self):
+        if (self._zmq_receive_task is not None) and not self._zmq_receive_task.done():
+            try:
+                self._zmq_receive_task.cancel()
+            except RuntimeError:
+                pass  # The loop is closed
+        self._zmq_receive_task = None
 
     async def _zmq_communicate(self, msg_out, *, timeout):
         if timeout is None:
             timeout = self._timeout_receive
-        if self._timeout_receive_last != timeout:
-            self._timeout_receive_last = timeout
-            self._zmq_socket.RCVTIMEO = timeout + 1
 
-        await self._zmq_send(msg_out)
-        msg_in = await self._zmq_receive(timeout=timeout)
+        self._request_counter += 1
+        request_id = self._request_counter.to_bytes(8, "big")
+
+        fut = asyncio.get_running_loop().create_future()
+        zmq_socket, pending = self._zmq_socket, self._pending
+        pending[request_id] = fut
+        self._start_receive_task()
+
+        try:
+            try:
+                await self._zmq_send(request_id, msg_out)
+            except Exception as ex:
+                # The message was not sent. The socket needs to be reset.
+                logger.exception("ZeroMQ communication failed: %s", ex)
+                self._zmq_socket_restart(zmq_socket)
+                raise
+
+            try:
+                msg_in = await asyncio.wait_for(fut, timeout=timeout / 1000)
+            except asyncio.TimeoutError:
+                # This is very likely a timeout (RE Manager is not responding or the request was lost,
+                #   e.g. if RE Manager was restarted). The socket is restarted and all pending
+                #   requests fail, so that the requests are not waiting for responses that may
+                #   never arrive.
+                logger.error("ZeroMQ communication failed: timeout occurred")
+                self._zmq_socket_restart(zmq_socket)
+                raise Exception("timeout occurred")
+        finally:
+            pending.pop(request_id, None)
         return msg_in
 
     def _zmq_socket_open(self):
-        self._zmq_socket = self._ctx.socket(zmq.REQ)
+        self._zmq_socket = self._ctx.socket(zmq.DEALER)
 
         if self._server_public_key:
             # Set server public key
@@ -1078,12 +1336,11 @@ class ZMQCommSendAsync:
             self._zmq_socket.set(zmq.CURVE_PUBLICKEY, _fixed_public_key.encode("utf-8"))
             self._zmq_socket.set(zmq.CURVE_SECRETKEY, _fixed_private_key.encode("utf-8"))
 
-        # Increment `self._timeout_receive` so that timeout supplied to `self._zmq_socket.poll`
-        #   expires first so that correct message is produced.
-        self._zmq_socket.RCVTIMEO = self._timeout_receive + 1
+        # Receive timeouts are handled by 'send_message()'
         self._zmq_socket.SNDTIMEO = self._timeout_send
         # Clear the buffer quickly after the socket is closed
         self._zmq_socket.setsockopt(zmq.LINGER, 100)
+        _set_zmq_client_socket_options(self._zmq_socket, self._zmq_server_address)
 
         # Successful connection does not mean that the socket exists
         self._zmq_socket.connect(self._zmq_server_address)
@@ -1091,8 +1348,23 @@ class ZMQCommSendAsync:
         logger.info("Connected to ZeroMQ server '%s'", self._zmq_server_address)
         logger.info("ZMQ encryption: %s", "disabled" if self._server_public_key is None else "enabled")
 
-    def _zmq_socket_restart(self):
+    def _zmq_socket_restart(self, zmq_socket):
+        """
+        Restart the socket. Responses to the requests sent over the closed socket are never
+        received, so the pending requests fail. The socket is not restarted if ``zmq_socket``
+        is not the current socket, i.e. if the socket was already restarted.
+        """
+        if self._zmq_socket is not zmq_socket:
+            return
+
+        self._stop_receive_task()
         self._zmq_socket.close()
+
+        pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(Exception("the socket was restarted due to communication error"))
+
         self._zmq_socket_open()
 
     def _create_msg(self, *, method, params=None):
@@ -1139,35 +1411,163 @@ class ZMQCommSendAsync:
         # Send empty dictionary if no parameters are passed
         params = params or {}
 
-        async with self._lock_zmq:
-            try:
-                msg_out = self._create_msg(method=method, params=params)
-                msg_in = await self._zmq_communicate(msg_out, timeout=timeout)
-            except Exception as ex:
-                # This is very likely a timeout (RE Manager is not responding)
-                self._zmq_socket_restart()
-                errmsg = f"ZMQ communication error: {str(ex)}"
-                use_ex = raise_exceptions if (raise_exceptions is not None) else self._raise_exceptions
-                if use_ex:
-                    raise CommTimeoutError(errmsg)
-                msg_in = {"success": False, "msg": errmsg}
-            return msg_in
+        try:
+            msg_out = self._create_msg(method=method, params=params)
+            msg_in = await self._zmq_communicate(msg_out, timeout=timeout)
+        except Exception as ex:
+            errmsg = f"ZMQ communication error: {str(ex)}"
+            use_ex = raise_exceptions if (raise_exceptions is not None) else self._raise_exceptions
+            if use_ex:
+                raise CommTimeoutError(errmsg)
+            msg_in = {"success": False, "msg": errmsg}
+        return msg_in
+
+    async def send_message_batch(self, messages, *, timeout=None, raise_exceptions=None, batch_size=None):
+        """
+        Send multiple messages to ZMQ server. The messages are sent without waiting for responses
+        to the previous messages, which saves a round-trip per message. The messages are processed
+        by the server in the order they are sent. Use this function only for messages that don't
+        depend on results of other messages in the batch. The responses are matched to the messages
+        by request ID: if the server does not respond to one of the messages, the response
+        (or the error message) returned for each message still corresponds to the message.
+
+        Parameters
+        ----------
+        messages: iterable(tuple)
+            Sequence of ``(method, params)`` tuples. ``params`` may be ``None``.
+        timeout: int or None
+            Read timeout (in ms) for each request. If ``None``, then the default timeout is used.
+        raise_exceptions: bool or None
+            The flag indicates if exception should be raised in case of communication error.
+            See ``send_message`` for details.
+        batch_size: int or None
+            Maximum number of messages waiting for responses. If ``None``, then all messages
+            are sent at once.
+
+        Returns
+        -------
+        list(dict)
+            Messages returned by the server in the same order as the sent messages.
+
+        Raises
+        ------
+        CommTimeoutError
+            Raised if communication error occurs and exceptions are enabled.
+        """
+        messages = list(messages)
+        batch_size = batch_size or max(len(messages), 1)
+
+        responses = []
+        for n in range(0, len(messages), batch_size):
+            responses.extend(
+                await asyncio.gather(
+                    *[
+                        self.send_message(
+                            method=method, params=params, timeout=timeout, raise_exceptions=raise_exceptions
+                        )
+                        for method, params in messages[n : n + batch_size]
+                    ]
+                )
+            )
+        return responses
 
     def close(self):
         """
-        Close ZMQ socket. Call to close socket if the object is no longer needed, but may
-        not be destroyed for some time.
+        Close ZMQ socket. The socket is not closed automatically when the object is deleted:
+        call the function once the object is no longer needed or use the object as a context
+        manager. The ZMQ context is shared by all instances and is not terminated.
+        Call ``zmq.asyncio.Context.instance().term()`` during process shutdown if needed.
         """
+        self._stop_receive_task()
         if self._zmq_socket:
             self._zmq_socket.close()
 
 
+# Clients used by ``zmq_single_request``. The clients are cached, so that repeated requests
+#   reuse the open socket (connection) instead of opening a new socket for each request.
+#   The clients are running on the event loop in a background thread. Each calling thread
+#   uses a separate client, so that a timeout of a request sent by one thread (the socket
+#   is restarted and pending requests fail) does not affect the requests sent by other threads.
+_shared_zmq_clients = {}  # {(thread_id, zmq_server_address, server_public_key): ZMQCommSendAsync}
+_shared_zmq_loop = None
+_shared_zmq_loop_pid = None  # The clients can not be used in a forked process
+_shared_zmq_lock = threading.Lock()
+
+
+def _get_shared_zmq_client(zmq_server_address, server_public_key):
+    """
+    Returns the client cached for the current thread, the server address and public key and
+    the event loop the client is running on. A new client is created if needed. The clients
+    created by the threads that no longer exist are closed.
+    """
+    global _shared_zmq_loop, _shared_zmq_loop_pid
+
+    with _shared_zmq_lock:
+        if _shared_zmq_loop_pid != os.getpid():
+            # The process was forked: the loop thread does not exist in this process.
+            _shared_zmq_clients.clear()
+            _shared_zmq_loop = None
+
+        if _shared_zmq_loop is None:
+            loop = asyncio.new_event_loop()
+            th = threading.Thread(target=loop.run_forever, name="QServer ZMQ Single Request", daemon=True)
+            th.start()
+            _shared_zmq_loop, _shared_zmq_loop_pid = loop, os.getpid()
+
+        key = (threading.get_ident(), zmq_server_address, server_public_key)
+        client = _shared_zmq_clients.get(key, None)
+        if client is None:
+            thread_ids = {_.ident for _ in threading.enumerate()}
+            for key_unused in [_ for _ in _shared_zmq_clients if _[0] not in thread_ids]:
+                _shared_zmq_loop.call_soon_threadsafe(_shared_zmq_clients.pop(key_unused).close)
+
+            async def create_client():
+                return ZMQCommSendAsync(zmq_server_address=zmq_server_address, server_public_key=server_public_key)
+
+            client = asyncio.run_coroutine_threadsafe(create_client(), _shared_zmq_loop).result()
+            _shared_zmq_clients[key] = client
+
+        return client, _shared_zmq_loop
+
+
+def close_shared_zmq_clients():
+    """
+    Close the sockets opened by ``zmq_single_request`` and stop the background event loop.
+    The function is called automatically when the process exits. It may be called
+    explicitly to release the resources. The sockets are reopened by the next call
+    to ``zmq_single_request``.
+    """
+    global _shared_zmq_loop
+
+    with _shared_zmq_lock:
+        if (_shared_zmq_loop is None) or (_shared_zmq_loop_pid != os.getpid()):
+            return
+
+        clients = list(_shared_zmq_clients.values())
+        _shared_zmq_clients.clear()
+
+        async def close_clients():
+            for client in clients:
+                client.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_clients(), _shared_zmq_loop).result(timeout=1)
+        except Exception as ex:
+            logger.warning("Failed to close ZMQ sockets: %s", ex)
+        _shared_zmq_loop.call_soon_threadsafe(_shared_zmq_loop.stop)
+        _shared_zmq_loop = None
+
+
+atexit.register(close_shared_zmq_clients)
+
+
 def zmq_single_request(method, params=None, *, timeout=None, zmq_server_address=None, server_public_key=None):
     """
-    Send a single request to ZMQ server. The function opens the socket, sends
-    a single ZMQ request and closes the socket. The function is not expected
-    to raise exceptions. In case of communication error the return value
-    of ``msg`` is ``None`` and ``err_msg`` contains the error message. Otherwise
+    Send a single request to ZMQ server. The function sends a single ZMQ request
+    and waits for the response. The socket is kept open and reused by the following
+    requests to the same server sent from the same thread (see ``close_shared_zmq_clients``).
+    The function is not expected to raise exceptions. In case of communication error the return
+    value of ``msg`` is ``None`` and ``err_msg`` contains the error message. Otherwise
     ``err_msg`` is empty and ``msg`` contains the dictionary returned by the server.
 
     Parameters
@@ -1198,22 +1598,13 @@ def zmq_single_request(method, params=None, *, timeout=None, zmq_server_address=
         Contains a message in case communication error (timeout) occurs. Empty string otherwise.
     """
 
-    msg_received = None
-
-    async def send_request(method, params):
-        nonlocal msg_received
-        zmq_to_manager = ZMQCommSendAsync(
-            zmq_server_address=zmq_server_address, server_public_key=server_public_key
-        )
-        msg_received = await zmq_to_manager.send_message(
-            method=method, params=params, timeout=timeout, raise_exceptions=True
-        )
-        zmq_to_manager.close()
-
     try:
-        asyncio.run(send_request(method, params))
-
-        msg = msg_received
+        zmq_to_manager, loop = _get_shared_zmq_client(zmq_server_address, server_public_key)
+        fut = asyncio.run_coroutine_threadsafe(
+            zmq_to_manager.send_message(method=method, params=params, timeout=timeout, raise_exceptions=True),
+            loop,
+        )
+        msg = fut.result()
         msg_err = ""
     except Exception as ex:
         msg = None
@@ -1223,3 +1614,55 @@ def zmq_single_request(method, params=None, *, timeout=None, zmq_server_address=
         logger.warning("Communication with RE Manager failed: %s", msg_err)
 
     return msg, msg_err
+
+
+def zmq_batch_request(messages, *, timeout=None, batch_size=None, zmq_server_address=None, server_public_key=None):
+    """
+    Send a batch of requests to ZMQ server. The requests are sent without waiting for
+    responses to the previous requests (see ``ZMQCommSendAsync.send_message_batch``).
+    The socket is shared with ``zmq_single_request`` called from the same thread. The function
+    is not expected to raise exceptions. In case of communication error the return value
+    of ``msgs`` is ``None`` and ``err_msg`` contains the error message.
+
+    Parameters
+    ----------
+    messages: iterable(tuple)
+        Sequence of ``(method, params)`` tuples. ``params`` may be ``None``.
+    timeout: int or None
+        Read timeout (in ms) for each request.
+    batch_size: int or None
+        Maximum number of requests waiting for responses. All requests are sent at once
+        if ``None``.
+    zmq_server_address: str or None
+        Address of the ZMQ control socket of RE Manager. Default address is used if the
+        value is ``None``.
+    server_public_key: str or None
+        Server public key (z85-encoded 40 character string). Encryption will be disabled
+        if ``None`` is passed.
+
+    Returns
+    -------
+    msgs: list(dict) or None
+        Messages received from RE Manager in response to the requests in the same order
+        as the requests. None if communication error (timeout) occurred.
+    err_msg: str
+        Contains a message in case communication error (timeout) occurs. Empty string otherwise.
+    """
+    try:
+        zmq_to_manager, loop = _get_shared_zmq_client(zmq_server_address, server_public_key)
+        fut = asyncio.run_coroutine_threadsafe(
+            zmq_to_manager.send_message_batch(
+                messages, timeout=timeout, raise_exceptions=True, batch_size=batch_size
+            ),
+            loop,
+        )
+        msgs = fut.result()
+        msg_err = ""
+    except Exception as ex:
+        msgs = None
+        msg_err = str(ex)
+
+    if msg_err:
+        logger.warning("Communication with RE Manager failed: %s", msg_err)
+
+    return msgs, msg_err
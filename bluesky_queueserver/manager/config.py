@@ -183,6 +183,7 @@ _key_mapping = {
     "zmq_private_key": "network/zmq_private_key",
     "zmq_info_addr": "network/zmq_info_addr",
     "zmq_publish_console": "network/zmq_publish_console",
+    "zmq_status_addr": "network/zmq_status_addr",
     "redis_addr": "network/redis_addr",
     "redis_name_prefix": "network/redis_name_prefix",
     "keep_re": "startup/keep_re",
@@ -334,6 +335,13 @@ class Settings:
             value_cli=self._args_existing("zmq_publish_console"),
         )
 
+        self._settings["zmq_status_addr"] = self._get_param(
+            value_default=args.zmq_status_addr,
+            value_ev=os.environ.get("QSERVER_ZMQ_STATUS_ADDRESS_FOR_SERVER", None),
+            value_config=self._get_value_from_config("zmq_status_addr"),
+            value_cli=self._args_existing("zmq_status_addr"),
+        )
+
         redis_addr = self._get_param(
             value_default=self._args.redis_addr,
             value_config=self._get_value_from_config("redis_addr"),
@@ -1,3 +1,4 @@
+import collections.abc
 import inspect
 import json
 import logging
@@ -5,6 +6,59 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def _json_default(obj):
+    """
+    Convert objects that are not supported by JSON encoder. Read-only mappings (such as
+    ``types.MappingProxyType``) are encoded as dictionaries. The function is called only for
+    the objects of unsupported types, so it does not slow down encoding of other objects.
+    """
+    if isinstance(obj, collections.abc.Mapping):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# 'orjson' is an optional dependency. If the package is installed, it is used for encoding
+#   and decoding JSON messages, which is substantially faster than the standard 'json' module.
+try:
+    import orjson
+
+    def json_dumps(obj):
+        """
+        Encode the object as JSON string using ``orjson``.
+        """
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    def json_dumps_bytes(obj):
+        """
+        Encode the object as JSON using ``orjson``. Returns UTF-8 encoded bytes.
+        """
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+    json_loads = orjson.loads
+
+except ImportError:
+    # Encoder and decoder are created once. The output format matches the output of 'orjson'.
+    _json_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=_json_default).encode
+    _json_decode = json.JSONDecoder().decode
+
+    json_dumps = _json_encode
+
+    def json_dumps_bytes(obj):
+        """
+        Encode the object as JSON. Returns UTF-8 encoded bytes.
+        """
+        return _json_encode(obj).encode("utf-8")
+
+    def json_loads(s):
+        """
+        Decode JSON message. The message may be ``str`` or UTF-8 encoded ``bytes``
+        or ``memoryview``.
+        """
+        if not isinstance(s, str):
+            s = bytes(s).decode("utf-8")
+        return _json_decode(s)
+
+
 class JSONRPCResponseManager:
     def __init__(self, *, use_json=True):
         """
@@ -57,7 +111,7 @@ class JSONRPCResponseManager:
             Decoded message.
         """
         if self._use_json:
-            return json.loads(msg)
+            return json_loads(msg)
         else:
             return msg
 
@@ -78,7 +132,7 @@ class JSONRPCResponseManager:
             (*dict* or *list(dict)*).
         """
         if self._use_json:
-            return json.dumps(msg)
+            return json_dumps(msg)
         else:
             return msg
 
@@ -140,15 +194,6 @@ class JSONRPCResponseManager:
                 error_code = -32601
                 raise TypeError(f"Unknown method: {method}")
 
-            try:
-                if isinstance(params, dict):
-                    inspect.getcallargs(handler, **params)
-                else:
-                    inspect.getcallargs(handler, *params)
-            except Exception as ex:
-                error_code = -32602
-                raise TypeError(f"Invalid params in the message {msg!r}: {ex}") from ex
-
             try:
                 if isinstance(params, dict):
                     result = handler(**params)
@@ -156,6 +201,19 @@ class JSONRPCResponseManager:
                     result = handler(*params)
                 if not is_notification:
                     response = {"jsonrpc": "2.0", "id": msg_id, "result": result}
+            except TypeError as ex_call:
+                # The parameters are validated only if the call failed: 'TypeError' may be raised
+                #   if the parameters do not match the signature of the handler or by the handler.
+                try:
+                    if isinstance(params, dict):
+                        inspect.getcallargs(handler, **params)
+                    else:
+                        inspect.getcallargs(handler, *params)
+                except Exception as ex:
+                    error_code = -32602
+                    raise TypeError(f"Invalid params in the message {msg!r}: {ex}") from ex
+                error_code = -32000
+                raise ex_call
             except Exception:
                 error_code = -32000
                 raise
@@ -13,6 +13,7 @@ import zmq.asyncio
 import bluesky_queueserver
 
 from .comms import CommTimeoutError, PipeJsonRpcSendAsync, validate_zmq_key
+from .json_rpc import json_dumps_bytes
 from .logging_setup import PPrintForLogging as ppfl
 from .logging_setup import setup_loggers
 from .output_streaming import setup_console_output_redirection
@@ -57,6 +58,66 @@ class MState(enum.Enum):
     DESTROYING_ENVIRONMENT = "destroying_environment"
 
 
+# 0MQ topics used for publishing RE Manager status and results of completed tasks
+_default_zmq_status_topic = "QS_Status"
+_default_zmq_task_result_topic = "QS_TaskResult"
+
+# Methods of 0MQ API: maps the method name to the name of the handler and the flag that indicates
+# if the method is read-only. Successful requests to methods that are not read-only may change
+# RE Manager status, so the status is republished after such requests.
+_zmq_handlers = {
+    "ping": ("_ping_handler", True),
+    "status": ("_status_handler", True),
+    "config_get": ("_config_get_handler", True),
+    "queue_get": ("_queue_get_handler", True),
+    "plans_allowed": ("_plans_allowed_handler", True),
+    "plans_existing": ("_plans_existing_handler", True),
+    "devices_allowed": ("_devices_allowed_handler", True),
+    "devices_existing": ("_devices_existing_handler", True),
+    "permissions_reload": ("_permissions_reload_handler", False),
+    "permissions_get": ("_permissions_get_handler", True),
+    "permissions_set": ("_permissions_set_handler", False),
+    "history_get": ("_history_get_handler", True),
+    "history_clear": ("_history_clear_handler", False),
+    "environment_open": ("_environment_open_handler", False),
+    "environment_close": ("_environment_close_handler", False),
+    "environment_destroy": ("_environment_destroy_handler", False),
+    "environment_update": ("_environment_update_handler", False),
+    "script_upload": ("_script_upload_handler", False),
+    "function_execute": ("_function_execute_handler", False),
+    "task_result": ("_task_result_handler", True),
+    "task_status": ("_task_status_handler", True),
+    "queue_mode_set": ("_queue_mode_set_handler", False),
+    "queue_item_add": ("_queue_item_add_handler", False),
+    "queue_item_add_batch": ("_queue_item_add_batch_handler", False),
+    "queue_item_update": ("_queue_item_update_handler", False),
+    "queue_item_get": ("_queue_item_get_handler", True),
+    "queue_item_remove": ("_queue_item_remove_handler", False),
+    "queue_item_remove_batch": ("_queue_item_remove_batch_handler", False),
+    "queue_item_move": ("_queue_item_move_handler", False),
+    "queue_item_move_batch": ("_queue_item_move_batch_handler", False),
+    "queue_item_execute": ("_queue_item_execute_handler", False),
+    "queue_clear": ("_queue_clear_handler", False),
+    "queue_start": ("_queue_start_handler", False),
+    "queue_stop": ("_queue_stop_handler", False),
+    "queue_stop_cancel": ("_queue_stop_cancel_handler", False),
+    "queue_autostart": ("_queue_autostart_handler", False),
+    "kernel_interrupt": ("_kernel_interrupt_handler", False),
+    "re_pause": ("_re_pause_handler", False),
+    "re_resume": ("_re_resume_handler", False),
+    "re_stop": ("_re_stop_handler", False),
+    "re_abort": ("_re_abort_handler", False),
+    "re_halt": ("_re_halt_handler", False),
+    "re_runs": ("_re_runs_handler", True),
+    "lock": ("_lock_handler", False),
+    "lock_info": ("_lock_info_handler", True),
+    "unlock": ("_unlock_handler", False),
+    "manager_stop": ("_manager_stop_handler", False),
+    "manager_kill": ("_manager_kill_handler", False),
+    "manager_test": ("_manager_test_handler", False),
+}
+
+
 class LockInfo:
     def __init__(self):
         self._lock_key_emergency = None
@@ -225,15 +286,18 @@ class RunEngineManager(Process):
         self._lock_info = LockInfo()  # Lock/unlock environment and/or queue
         self._lock_info.set_emergency_lock_key(config["lock_key_emergency"])
 
+        # Set when the state of the manager or the worker is changed. The event is created in the loop.
+        self._status_changed_event = None
+
         # The following attributes hold the state of the system
         self._manager_stopping = False  # Set True to exit manager (by _manager_stop_handler)
         self._environment_exists = False  # True if RE Worker environment exists
-        self._manager_state = MState.INITIALIZING
+        self.__manager_state = MState.INITIALIZING
         self.__queue_stop_pending = False  # Queue is in the process of being stopped
         self._re_pause_pending = False  # True when worker process has accepted our pause request but
         # we (this manager process) have not yet seen it as 'paused', useful for the situations where the
         # worker did accept a request to pause (deferred) but had already passed its last checkpoint
-        self._worker_state_info = None  # Copy of the last downloaded state of RE Worker
+        self.__worker_state_info = None  # Copy of the last downloaded state of RE Worker
 
         self.__queue_autostart_enabled = False
         self._queue_autostart_event = None
@@ -257,6 +321,11 @@ class RunEngineManager(Process):
                 if self._zmq_private_key is not None:
                     validate_zmq_key(self._zmq_private_key)
 
+        # Publishing of RE Manager status is disabled if the address is None
+        self._zmq_status_socket = None
+        self._zmq_status_addr = config.get("zmq_status_addr", None) if config else None
+        self._status_publisher_task = None
+
         logger.info("Starting ZMQ server at '%s'", self._zmq_ip_server)
         logger.info(
             "ZMQ control channels: encryption %s", "disabled" if self._zmq_private_key is None else "enabled"
@@ -310,6 +379,35 @@ class RunEngineManager(Process):
             ug_permissions_reload = "ON_STARTUP"
         self._user_group_permissions_reload_option = ug_permissions_reload
 
+    @property
+    def _manager_state(self):
+        return self.__manager_state
+
+    @_manager_state.setter
+    def _manager_state(self, state):
+        self.__manager_state = state
+        self._status_changed()
+
+    @property
+    def _worker_state_info(self):
+        return self.__worker_state_info
+
+    @_worker_state_info.setter
+    def _worker_state_info(self, state_info):
+        # The state of the worker is downloaded periodically and rarely changes.
+        changed = state_info != self.__worker_state_info
+        self.__worker_state_info = state_info
+        if changed:
+            self._status_changed()
+
+    def _status_changed(self):
+        """
+        Notify the status publisher that RE Manager status may have changed, e.g. the state
+        of the manager or the worker, the queue, the history or the lists of plans and devices.
+        """
+        if self._status_changed_event:
+            self._status_changed_event.set()
+
     @property
     def queue_stop_pending(self):
         """
@@ -323,6 +421,7 @@ class RunEngineManager(Process):
         """
         enabled = bool(enabled)
         self.__queue_stop_pending = enabled
+        self._status_changed()
         if self._plan_queue:
             await self._plan_queue.stop_pending_save({"enabled": enabled})
 
@@ -339,6 +438,7 @@ class RunEngineManager(Process):
         """
         enabled = bool(enabled)
         self.__queue_autostart_enabled = enabled
+        self._status_changed()
         if self._plan_queue:
             await self._plan_queue.autostart_mode_save({"enabled": enabled})
 
@@ -356,6 +456,47 @@ class RunEngineManager(Process):
             except Exception as ex:
                 logger.warning(f"Exception occurred while sending heartbeat: {ex}")
 
+    async def _status_publisher(self):
+        """
+        Publish RE Manager status to 0MQ socket each time the state of the manager or the worker
+        is changed. The status is also republished periodically, so that the clients that subscribed
+        after the last change receive the current status.
+        """
+        t_period = 1
+        topic = _default_zmq_status_topic.encode("ascii")
+        status_published = None
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._status_changed_event.wait(), timeout=t_period)
+                    republish = False
+                except asyncio.TimeoutError:
+                    republish = True
+                self._status_changed_event.clear()
+
+                status = await self._status_handler({})
+                if republish or (status != status_published):
+                    await self._zmq_status_socket.send_multipart([topic, json_dumps_bytes(status)])
+                    status_published = status
+            except asyncio.CancelledError:
+                break
+            except Exception as ex:
+                logger.warning(f"Exception occurred while publishing RE Manager status: {ex}")
+
+    async def _publish_task_result(self, *, task_uid, result):
+        """
+        Publish the result of the completed task to 0MQ socket. The result is published
+        only if publishing of RE Manager status is enabled.
+        """
+        if not self._zmq_status_socket:
+            return
+        try:
+            topic = _default_zmq_task_result_topic.encode("ascii")
+            payload = json_dumps_bytes({"task_uid": task_uid, "result": result})
+            await self._zmq_status_socket.send_multipart([topic, payload])
+        except Exception as ex:
+            logger.warning(f"Exception occurred while publishing the result of the task {task_uid!r}: {ex}")
+
     # ======================================================================
     #          Functions that implement functionality of the server
 
@@ -581,6 +722,7 @@ class RunEngineManager(Process):
             err_msg="RE Worker environment was destroyed",
             err_tb="",
         )
+        self._status_changed()
 
         err_msg = "" if success else "Failed to properly destroy RE Worker environment."
         logger.info("RE Worker environment is destroyed")
@@ -743,6 +885,9 @@ class RunEngineManager(Process):
             else:
                 logger.error("Unknown plan state %s was returned by RE Worker.", plan_state)
 
+        # The processed item was moved to the history or pushed back to the queue
+        self._status_changed()
+
     async def _set_manager_state(self, state, *, coro=None, autostart_disable=False):
         """
         Set manager state to ``MState.IDLE`` or ``MState.PAUSE``. When using IPython kernel,
@@ -786,6 +931,7 @@ class RunEngineManager(Process):
         else:
             self._re_run_list = run_list["run_list"]
             self._re_run_list_uid = _generate_uid()
+            self._status_changed()
 
     def _set_existing_plans_and_devices(self, *, existing_plans, existing_devices, always_update_uids=False):
         """
@@ -834,6 +980,8 @@ class RunEngineManager(Process):
             except Exception as ex:
                 logger.exception("Failed to compute the list of allowed plans and devices: %s", ex)
 
+            self._status_changed()
+
     async def _load_task_results_from_worker(self):
         """
         Download results of the completed tasks from worker process.
@@ -856,6 +1004,8 @@ class RunEngineManager(Process):
                 def factory(*, task_uid, task_res):
                     async def inner():
                         await self._task_results.add_completed_task(task_uid=task_uid, payload=task_res)
+                        self._status_changed()
+                        await self._publish_task_result(task_uid=task_uid, result=task_res)
 
                     return inner
 
@@ -3527,58 +3677,6 @@ class RunEngineManager(Process):
         return {"success": success, "msg": msg}
 
     async def _zmq_execute(self, msg):
-        handler_dict = {
-            "ping": "_ping_handler",
-            "status": "_status_handler",
-            "config_get": "_config_get_handler",
-            "queue_get": "_queue_get_handler",
-            "plans_allowed": "_plans_allowed_handler",
-            "plans_existing": "_plans_existing_handler",
-            "devices_allowed": "_devices_allowed_handler",
-            "devices_existing": "_devices_existing_handler",
-            "permissions_reload": "_permissions_reload_handler",
-            "permissions_get": "_permissions_get_handler",
-            "permissions_set": "_permissions_set_handler",
-            "history_get": "_history_get_handler",
-            "history_clear": "_history_clear_handler",
-            "environment_open": "_environment_open_handler",
-            "environment_close": "_environment_close_handler",
-            "environment_destroy": "_environment_destroy_handler",
-            "environment_update": "_environment_update_handler",
-            "script_upload": "_script_upload_handler",
-            "function_execute": "_function_execute_handler",
-            "task_result": "_task_result_handler",
-            "task_status": "_task_status_handler",
-            "queue_mode_set": "_queue_mode_set_handler",
-            "queue_item_add": "_queue_item_add_handler",
-            "queue_item_add_batch": "_queue_item_add_batch_handler",
-            "queue_item_update": "_queue_item_update_handler",
-            "queue_item_get": "_queue_item_get_handler",
-            "queue_item_remove": "_queue_item_remove_handler",
-            "queue_item_remove_batch": "_queue_item_remove_batch_handler",
-            "queue_item_move": "_queue_item_move_handler",
-            "queue_item_move_batch": "_queue_item_move_batch_handler",
-            "queue_item_execute": "_queue_item_execute_handler",
-            "queue_clear": "_queue_clear_handler",
-            "queue_start": "_queue_start_handler",
-            "queue_stop": "_queue_stop_handler",
-            "queue_stop_cancel": "_queue_stop_cancel_handler",
-            "queue_autostart": "_queue_autostart_handler",
-            "kernel_interrupt": "_kernel_interrupt_handler",
-            "re_pause": "_re_pause_handler",
-            "re_resume": "_re_resume_handler",
-            "re_stop": "_re_stop_handler",
-            "re_abort": "_re_abort_handler",
-            "re_halt": "_re_halt_handler",
-            "re_runs": "_re_runs_handler",
-            "lock": "_lock_handler",
-            "lock_info": "_lock_info_handler",
-            "unlock": "_unlock_handler",
-            "manager_stop": "_manager_stop_handler",
-            "manager_kill": "_manager_kill_handler",
-            "manager_test": "_manager_test_handler",
-        }
-
         try:
             if isinstance(msg, str):
                 raise Exception(f"Failed to decode the request: {msg}")
@@ -3595,9 +3693,13 @@ class RunEngineManager(Process):
             method = msg["method"]  # Required
             params = msg.get("params", {})  # Optional
 
-            handler_name = handler_dict[method]
+            handler_name, read_only = _zmq_handlers[method]
             handler = getattr(self, handler_name)
             result = await handler(params)
+
+            # The request may have changed the queue, the history, the lock etc.
+            if not read_only:
+                self._status_changed()
         except KeyError:
             result = {"success": False, "msg": f"Unknown method {method!r}"}
         except AttributeError:
@@ -3631,6 +3733,7 @@ class RunEngineManager(Process):
         self._loop = asyncio.get_running_loop()
         self._exec_loop_deactivated_event = asyncio.Event()
         self._queue_autostart_event = asyncio.Event()
+        self._status_changed_event = asyncio.Event()
 
         self._comm_to_watchdog = PipeJsonRpcSendAsync(
             conn=self._watchdog_conn,
@@ -3778,6 +3881,12 @@ class RunEngineManager(Process):
         self._zmq_socket.bind(self._zmq_ip_server)
         logger.info("ZeroMQ server is waiting on %s", str(self._zmq_ip_server))
 
+        if self._zmq_status_addr:
+            self._zmq_status_socket = self._ctx.socket(zmq.PUB)
+            self._zmq_status_socket.bind(self._zmq_status_addr)
+            self._status_publisher_task = asyncio.ensure_future(self._status_publisher(), loop=self._loop)
+            logger.info("Publishing RE Manager status to 0MQ socket at %s", str(self._zmq_status_addr))
+
         if self._manager_state == MState.INITIALIZING:
             self._manager_state = MState.IDLE
 
@@ -3814,10 +3923,14 @@ class RunEngineManager(Process):
 
                 await self._watchdog_manager_stopping()
                 self._heartbeat_generator_task.cancel()
+                if self._status_publisher_task:
+                    self._status_publisher_task.cancel()
                 self._comm_to_watchdog.stop()
                 self._comm_to_worker.stop()
                 await self._plan_queue.stop()
                 self._zmq_socket.close()
+                if self._zmq_status_socket:
+                    self._zmq_status_socket.close()
                 logger.info("RE Manager was stopped by ZMQ command.")
                 break
 
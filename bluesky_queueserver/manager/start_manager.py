@@ -325,6 +325,18 @@ def start_manager():
         default=None,
         help="The parameter is deprecated and will be removed in future releases. Use --zmq-control-addr instead.",
     )
+    parser.add_argument(
+        "--zmq-status-addr",
+        dest="zmq_status_addr",
+        type=str,
+        default=None,
+        help="The address of ZMQ server socket (PUB) used for publishing RE Manager status in 'QS_Status' "
+        "topic. The status is published each time the state of RE Manager or RE Worker changes. "
+        "The results of completed tasks are published in 'QS_TaskResult' topic. The parameter overrides "
+        "the address defined by the environment variable "
+        "QSERVER_ZMQ_STATUS_ADDRESS_FOR_SERVER. Publishing of the status is disabled if the parameter or "
+        "the environment variable is not defined. Address format: 'tcp://*:60635' (default: None).",
+    )
 
     parser.add_argument(
         "--startup-profile",
@@ -834,6 +846,7 @@ def start_manager():
 
     config_manager["zmq_addr"] = settings.zmq_control_addr
     config_manager["zmq_private_key"] = settings.zmq_private_key
+    config_manager["zmq_status_addr"] = settings.zmq_status_addr
 
     config_manager["redis_addr"] = settings.redis_addr
     config_manager["redis_name_prefix"] = settings.redis_name_prefix
@@ -1,4 +1,7 @@
 import asyncio
+import contextlib
+import copy
+import functools
 import glob
 import logging
 import os
@@ -11,10 +14,14 @@ import time as ttime
 from threading import Thread
 
 import pytest
+import zmq
+import zmq.asyncio
 from jupyter_client import BlockingKernelClient
 
-from bluesky_queueserver.manager.comms import zmq_single_request
+from bluesky_queueserver.manager.comms import ZMQCommSendAsync, zmq_single_request
 from bluesky_queueserver.manager.config import to_boolean
+from bluesky_queueserver.manager.json_rpc import json_loads
+from bluesky_queueserver.manager.manager import _default_zmq_status_topic, _default_zmq_task_result_topic
 from bluesky_queueserver.manager.plan_queue_ops import PlanQueueOperations
 from bluesky_queueserver.manager.profile_ops import get_default_startup_dir
 
@@ -201,6 +208,90 @@ def clear_qserver_zmq_address(mpatch):
     mpatch.delenv(_name_ev_zmq_address)
 
 
+def get_xdist_worker_index():
+    """
+    Returns the index of ``pytest-xdist`` worker (e.g. ``3`` for ``gw3``) or ``None`` if the tests
+    are not run by ``pytest-xdist``.
+    """
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", None)
+    if worker_id is None:
+        return None
+    return int(worker_id.lstrip("gw"))
+
+
+# The base port for ZMQ control sockets of RE Managers run by pytest-xdist workers.
+_xdist_zmq_control_port_base = 61615
+
+
+@pytest.fixture(scope="module")
+def re_manager_xdist_isolation():
+    """
+    Isolate RE Managers started in different ``pytest-xdist`` workers. RE Manager started by
+    the fixtures (``re_manager``, ``re_manager_cmd``, ``re_manager_shared`` etc.) uses the ZMQ control
+    port and the prefix for Redis keys unique for the worker. The fixture does nothing if the tests
+    are not run by ``pytest-xdist``. Use the fixture only in the modules that communicate with RE Manager
+    using ``zmq_secure_request`` or the async helpers, since ``zmq_single_request`` always
+    connects to the default address.
+    """
+    index = get_xdist_worker_index()
+    if index is None:
+        yield
+        return
+
+    port = _xdist_zmq_control_port_base + index
+    with pytest.MonkeyPatch.context() as mpatch:
+        mpatch.setenv("QSERVER_ZMQ_CONTROL_ADDRESS_FOR_SERVER", f"tcp://*:{port}")
+        mpatch.setenv(_name_ev_zmq_address, f"tcp://localhost:{port}")
+        mpatch.setattr(sys.modules[__name__], "_test_redis_name_prefix", f"{_test_redis_name_prefix}_gw{index}")
+        yield
+
+
+_name_ev_zmq_status_address = "_TEST_QSERVER_ZMQ_STATUS_ADDRESS_"
+
+# The base port for ZMQ sockets used by RE Managers for publishing status.
+_zmq_status_port_base = 61715
+
+
+@pytest.fixture(scope="module")
+def re_manager_status_publishing():
+    """
+    Enable publishing of the status by RE Managers started by the fixtures (``re_manager``,
+    ``re_manager_cmd``, ``re_manager_shared`` etc.). The async helpers (``wait_for_condition_async``
+    and ``wait_for_status_async``) wait for the published status instead of polling RE Manager.
+    The port is unique for each ``pytest-xdist`` worker.
+    """
+    port = _zmq_status_port_base + (get_xdist_worker_index() or 0)
+    with pytest.MonkeyPatch.context() as mpatch:
+        mpatch.setenv("QSERVER_ZMQ_STATUS_ADDRESS_FOR_SERVER", f"tcp://*:{port}")
+        mpatch.setenv(_name_ev_zmq_status_address, f"tcp://localhost:{port}")
+        yield
+
+
+@pytest.fixture(scope="module")
+def re_manager_ipc_transport(tmp_path_factory, re_manager_xdist_isolation, re_manager_status_publishing):
+    """
+    Use IPC transport (``ipc://``) instead of TCP loopback for the control and the status sockets
+    of RE Managers started by the fixtures (``re_manager``, ``re_manager_cmd``, ``re_manager_shared`` etc.).
+    The socket files are created in a temporary directory unique for the module, so the addresses
+    are also unique for each ``pytest-xdist`` worker. The fixture overrides the addresses set by
+    ``re_manager_xdist_isolation`` and ``re_manager_status_publishing``. TCP transport is used on Windows,
+    which does not support IPC transport.
+    """
+    if sys.platform == "win32":
+        yield
+        return
+
+    socket_dir = tmp_path_factory.mktemp("ipc")
+    zmq_control_addr = f"ipc://{socket_dir / 'control'}"
+    zmq_status_addr = f"ipc://{socket_dir / 'status'}"
+    with pytest.MonkeyPatch.context() as mpatch:
+        mpatch.setenv("QSERVER_ZMQ_CONTROL_ADDRESS_FOR_SERVER", zmq_control_addr)
+        mpatch.setenv(_name_ev_zmq_address, zmq_control_addr)
+        mpatch.setenv("QSERVER_ZMQ_STATUS_ADDRESS_FOR_SERVER", zmq_status_addr)
+        mpatch.setenv(_name_ev_zmq_status_address, zmq_status_addr)
+        yield
+
+
 def zmq_secure_request(method, params=None, *, zmq_server_address=None, server_public_key=None):
     """
     Wrapper for 'zmq_single_request'. Verifies if environment variable holding server public key is set
@@ -306,35 +397,35 @@ def condition_ip_kernel_busy(msg):
     return msg["ip_kernel_state"] == "busy"
 
 
-def wait_for_condition(time, condition):
+def wait_for_condition(time, condition, *, interval=0.02, max_interval=0.25, factor=1.5):
     """
     Wait until queue is processed. Note: processing of TimeoutError is needed for
-    monitoring RE Manager while it is restarted.
+    monitoring RE Manager while it is restarted. The status is polled with exponentially
+    increasing period: from ``interval`` to ``max_interval`` (seconds).
     """
-    dt = 0.5  # Period for checking the queue status
     time_stop = ttime.time() + time
     while ttime.time() < time_stop:
-        ttime.sleep(dt / 2)
+        ttime.sleep(interval)
         try:
             msg = get_manager_status()
             if condition(msg):
                 return True
         except TimeoutError:
             pass
-        ttime.sleep(dt / 2)
+        interval = min(interval * factor, max_interval)
     return False
 
 
-def wait_for_task_result(time, task_uid):
+def wait_for_task_result(time, task_uid, *, interval=0.02, max_interval=0.25, factor=1.5):
     """
     Wait for the results of the task defined by ``task_uid``. Raises ``TimeoutError`` if
     timeout ``time`` is exceeded while waiting for the task result. Returns the task result
-    of the task only if it was completed.
+    of the task only if it was completed. The task result is polled with exponentially
+    increasing period: from ``interval`` to ``max_interval`` (seconds).
     """
-    dt = 0.2  # Period for checking if the task is available
     time_stop = ttime.time() + time
     while ttime.time() < time_stop:
-        ttime.sleep(dt / 2)
+        ttime.sleep(interval)
         try:
             resp, _ = zmq_secure_request("task_result", params={"task_uid": task_uid})
 
@@ -346,11 +437,359 @@ def wait_for_task_result(time, task_uid):
 
         except TimeoutError:
             pass
-        ttime.sleep(dt / 2)
+        interval = min(interval * factor, max_interval)
 
     raise TimeoutError(f"Timeout occurred while waiting for results of the task {task_uid!r}")
 
 
+class ManagerStatusCache:
+    """
+    Cache for RE Manager status loaded by ``get_manager_status_async``. Consecutive checks of
+    the status performed within ``ttl`` seconds are served from the cache instead of sending
+    a request to RE Manager. The cache is invalidated by each request sent using
+    ``zmq_request_async`` or ``zmq_batch_request_async`` (except ``status`` requests), since
+    the request may change the state of RE Manager. The cache is also invalidated each time
+    the status is loaded bypassing the cache and when the functions waiting for changes
+    of the status (e.g. ``wait_for_condition_async``) exit.
+
+    Parameters
+    ----------
+    ttl: float
+        Time (in seconds) during which the cached status is considered valid.
+    """
+
+    def __init__(self, *, ttl=0.01):
+        self._ttl = ttl
+        self._status = None
+        self._time = 0
+
+    def invalidate(self):
+        """
+        Invalidate the cached status.
+        """
+        self._status = None
+
+    def update(self, status):
+        """
+        Save the status in the cache.
+        """
+        self._status = copy.deepcopy(status)
+        self._time = ttime.monotonic()
+
+    def get(self):
+        """
+        Returns the copy of the cached status or ``None`` if the status is not cached or expired.
+        """
+        if (self._status is None) or (ttime.monotonic() - self._time > self._ttl):
+            return None
+        return copy.deepcopy(self._status)
+
+
+_manager_status_cache = ManagerStatusCache()
+
+
+def _invalidate_manager_status_cache_on_exit(func):
+    """
+    Decorator for the functions that wait for changes of RE Manager status: the cached status
+    is invalidated when the function exits, since the status may have changed while waiting.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _manager_status_cache.invalidate()
+
+    return wrapper
+
+
+# Clients used by ``zmq_request_async`` and ``zmq_batch_request_async``:
+#   {(zmq_server_address, server_public_key): ZMQCommSendAsync}. The clients are reused by the requests
+#   sent from the same event loop (each async test is executed on a new loop), so that the socket
+#   is not created for each request.
+_zmq_clients_async = {}
+
+
+def _get_zmq_client_async(zmq_server_address, server_public_key):
+    """
+    Returns the client for the server address and public key. The client is created
+    if it does not exist or it was created on a different (closed) event loop.
+    """
+    loop = asyncio.get_running_loop()
+    key = (zmq_server_address, server_public_key)
+    client = _zmq_clients_async.get(key, None)
+    if (client is None) or (client.get_loop() is not loop):
+        if client is not None:
+            client.close()
+        client = ZMQCommSendAsync(
+            loop=loop, zmq_server_address=zmq_server_address, server_public_key=server_public_key
+        )
+        _zmq_clients_async[key] = client
+    return client
+
+
+async def zmq_request_async(method, params=None, *, zmq_server_address=None, server_public_key=None):
+    """
+    Async version of ``zmq_secure_request``. The request is sent using ``ZMQCommSendAsync``.
+    The client is reused by the following requests sent from the same event loop. Server public
+    key and ZMQ server address are loaded from environment variables if they are not passed
+    as parameters (see ``zmq_secure_request``). The function does not raise exceptions in case
+    of communication errors.
+
+    Returns
+    -------
+    msg: dict or None
+        Message received from RE Manager in response to the request. None if communication
+        error (timeout) occurred.
+    err_msg: str
+        Contains a message in case communication error (timeout) occurs. Empty string otherwise.
+    """
+    server_public_key = server_public_key or os.environ.get(_name_ev_public_key, None)
+    zmq_server_address = zmq_server_address or os.environ.get(_name_ev_zmq_address, None)
+
+    try:
+        zmq_to_manager = _get_zmq_client_async(zmq_server_address, server_public_key)
+        msg = await zmq_to_manager.send_message(method=method, params=params, raise_exceptions=True)
+        msg_err = ""
+    except Exception as ex:
+        msg, msg_err = None, str(ex)
+    finally:
+        if method != "status":
+            _manager_status_cache.invalidate()
+
+    return msg, msg_err
+
+
+async def zmq_batch_request_async(messages, *, zmq_server_address=None, server_public_key=None):
+    """
+    Async version of ``zmq_batch_request``. The requests are sent without waiting for responses
+    to the previous requests. Server public key and ZMQ server address are loaded from environment
+    variables if they are not passed as parameters (see ``zmq_secure_request``).
+
+    Returns
+    -------
+    msgs: list(dict) or None
+        Messages received from RE Manager in response to the requests. None if communication
+        error (timeout) occurred.
+    err_msg: str
+        Contains a message in case communication error (timeout) occurs. Empty string otherwise.
+    """
+    server_public_key = server_public_key or os.environ.get(_name_ev_public_key, None)
+    zmq_server_address = zmq_server_address or os.environ.get(_name_ev_zmq_address, None)
+
+    try:
+        zmq_to_manager = _get_zmq_client_async(zmq_server_address, server_public_key)
+        msgs = await zmq_to_manager.send_message_batch(messages, raise_exceptions=True)
+        msg_err = ""
+    except Exception as ex:
+        msgs, msg_err = None, str(ex)
+    finally:
+        _manager_status_cache.invalidate()
+
+    return msgs, msg_err
+
+
+async def get_manager_status_async(*, use_cache=True):
+    """
+    Load RE Manager status. If ``use_cache`` is ``True``, then the status loaded during the last
+    ``ttl`` seconds is returned from the cache (see ``ManagerStatusCache``). If ``use_cache`` is
+    ``False``, then the status is always requested from RE Manager and the cache is invalidated.
+    """
+    if use_cache:
+        msg = _manager_status_cache.get()
+        if msg is not None:
+            return msg
+
+    msg, _ = await zmq_request_async("status")
+    if msg is None:
+        raise TimeoutError("Timeout occurred while reading RE Manager status.")
+    if use_cache:
+        _manager_status_cache.update(msg)
+    else:
+        # The cached status may be older than the loaded status
+        _manager_status_cache.invalidate()
+    return msg
+
+
+async def _wait_for_published_status(predicate, *, zmq_status_address):
+    """
+    Wait for the status published by RE Manager that satisfies ``predicate(status)`` and return
+    the status. The status is also requested from RE Manager once after subscribing, since
+    the condition may already be satisfied. Use with ``asyncio.wait_for`` to set timeout.
+    """
+    socket = zmq.asyncio.Context.instance().socket(zmq.SUB)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.connect(zmq_status_address)
+    socket.subscribe(_default_zmq_status_topic)
+
+    try:
+        try:
+            status = await get_manager_status_async(use_cache=False)
+            if predicate(status):
+                return status
+        except TimeoutError:
+            pass
+
+        while True:
+            _, payload = await socket.recv_multipart()
+            status = json_loads(payload)
+            if predicate(status):
+                return status
+    finally:
+        socket.close()
+
+
+@_invalidate_manager_status_cache_on_exit
+async def wait_for_condition_async(time, condition, *, interval=0.02, max_interval=0.25, factor=1.5):
+    """
+    Async version of ``wait_for_condition``. Returns ``True`` if the condition
+    was satisfied before the timeout expired and ``False`` otherwise. If publishing of
+    the status is enabled (see ``re_manager_status_publishing``), then the function waits for
+    the published status instead of polling RE Manager.
+    """
+    zmq_status_address = os.environ.get(_name_ev_zmq_status_address, None)
+    if zmq_status_address:
+        try:
+            await asyncio.wait_for(
+                _wait_for_published_status(condition, zmq_status_address=zmq_status_address), timeout=time
+            )
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def poll(interval):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if condition(await get_manager_status_async(use_cache=False)):
+                    return
+            except TimeoutError:
+                pass
+            interval = min(interval * factor, max_interval)
+
+    try:
+        await asyncio.wait_for(poll(interval), timeout=time)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def _load_task_result_async(task_uid):
+    """
+    Request the result of the task. Returns the result if the task is completed and ``None`` otherwise.
+    """
+    resp, _ = await zmq_request_async("task_result", params={"task_uid": task_uid})
+    if resp is not None:
+        assert resp["success"] is True, f"Request for task result failed: {resp['msg']}"
+        assert resp["task_uid"] == task_uid
+
+        if resp["status"] == "completed":
+            return resp["result"]
+    return None
+
+
+async def _wait_for_published_task_result(task_uid, *, zmq_status_address, check_period=1):
+    """
+    Wait for the result of the task published by RE Manager and return the result. The result is
+    also requested from RE Manager once after subscribing and each time no results are published
+    during ``check_period`` (seconds), since the result published before the subscription is
+    established is lost. Use with ``asyncio.wait_for`` to set timeout.
+    """
+    socket = zmq.asyncio.Context.instance().socket(zmq.SUB)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.connect(zmq_status_address)
+    socket.subscribe(_default_zmq_task_result_topic)
+
+    try:
+        result = await _load_task_result_async(task_uid)
+        while result is None:
+            if await socket.poll(timeout=int(check_period * 1000)):
+                _, payload = await socket.recv_multipart()
+                msg = json_loads(payload)
+                if msg["task_uid"] == task_uid:
+                    result = msg["result"]
+            else:
+                result = await _load_task_result_async(task_uid)
+        return result
+    finally:
+        socket.close()
+
+
+@_invalidate_manager_status_cache_on_exit
+async def wait_for_task_result_async(time, task_uid, *, interval=0.02, max_interval=0.25, factor=1.5):
+    """
+    Async version of ``wait_for_task_result``. Raises ``TimeoutError`` if timeout ``time``
+    is exceeded while waiting for the task result. Waits for the published result if publishing
+    of the status is enabled (see ``wait_for_condition_async``).
+    """
+
+    async def poll(interval):
+        while True:
+            await asyncio.sleep(interval)
+            result = await _load_task_result_async(task_uid)
+            if result is not None:
+                return result
+            interval = min(interval * factor, max_interval)
+
+    zmq_status_address = os.environ.get(_name_ev_zmq_status_address, None)
+    if zmq_status_address:
+        coro = _wait_for_published_task_result(task_uid, zmq_status_address=zmq_status_address)
+    else:
+        coro = poll(interval)
+
+    try:
+        return await asyncio.wait_for(coro, timeout=time)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Timeout occurred while waiting for results of the task {task_uid!r}")
+
+
+@_invalidate_manager_status_cache_on_exit
+async def wait_for_status_async(predicate, timeout=5, interval=0.05):
+    """
+    Poll RE Manager status until ``predicate(status)`` returns ``True``. Returns the first
+    status that satisfies the predicate. Raises ``TimeoutError`` if the timeout expires.
+    Waits for the published status if publishing of the status is enabled
+    (see ``wait_for_condition_async``).
+    """
+    zmq_status_address = os.environ.get(_name_ev_zmq_status_address, None)
+    if zmq_status_address:
+        try:
+            return await asyncio.wait_for(
+                _wait_for_published_status(predicate, zmq_status_address=zmq_status_address), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError("Timeout occurred while waiting for the status published by RE Manager.")
+
+    status = None
+
+    async def poll():
+        nonlocal status
+        while True:
+            try:
+                status = await get_manager_status_async(use_cache=False)
+                if predicate(status):
+                    return status
+            except TimeoutError:
+                pass
+            await asyncio.sleep(interval)
+
+    try:
+        return await asyncio.wait_for(poll(), timeout=timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Timeout occurred while waiting for RE Manager status. Last status: {status}")
+
+
+async def run_in_thread_async(func, *args, **kwargs):
+    """
+    Run blocking function (e.g. starting RE Manager using ``re_manager_cmd`` or sending
+    commands using ``IPKernelClient``) in a separate thread, so that the event loop is not blocked
+    while the function is running. Returns the value returned by the function.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
 def clear_redis_pool(redis_name_prefix=_test_redis_name_prefix):
     # Remove all Redis entries.
     pq = PlanQueueOperations(name_prefix=redis_name_prefix)
@@ -645,6 +1084,150 @@ def re_manager_pc_copy(tmp_path):
         re.kill_manager()
 
 
+# Fixtures that start RE Manager for a single test
+_re_manager_fixture_names = ("re_manager", "re_manager_cmd", "re_manager_pc_copy")
+
+
+@pytest.fixture(autouse=True)
+def environment_teardown(request):
+    """
+    Close RE Worker environment at the end of the test if it is still open and verify that
+    ``ip_kernel_state`` and ``ip_kernel_captured`` are reset. The fixture is active in the modules
+    that import it. It does nothing for the tests that use ``re_manager_shared``, since the environment
+    is closed once at module teardown.
+    """
+    fixture_names = [_ for _ in _re_manager_fixture_names if _ in request.fixturenames]
+    # Set up RE Manager first, so that the environment is closed before RE Manager is stopped.
+    for name in fixture_names:
+        request.getfixturevalue(name)
+
+    yield
+
+    if not fixture_names:
+        return
+
+    try:
+        status = get_manager_status()
+    except TimeoutError:
+        return  # RE Manager is not running
+
+    if status["worker_environment_exists"]:
+        resp, _ = zmq_secure_request("environment_close")
+        assert resp["success"] is True, pprint.pformat(resp)
+        assert resp["msg"] == ""
+        assert wait_for_condition(time=3, condition=condition_environment_closed)
+        status = get_manager_status()
+
+    assert status["ip_kernel_state"] is None, pprint.pformat(status)
+    assert status["ip_kernel_captured"] is None, pprint.pformat(status)
+
+
+# RE Manager started by ``re_manager_shared`` uses ZMQ ports shifted by the offset and a separate prefix
+#   for Redis keys, so that it does not clash with RE Managers started by the function-scoped fixtures.
+_re_manager_shared_port_offset = 200
+
+
+def _re_manager_shared_address(address):
+    """
+    Returns the address of a ZMQ socket of shared RE Manager based on the address used by
+    RE Managers started by the function-scoped fixtures.
+    """
+    if address.startswith("ipc://"):
+        return f"{address}_shared"
+    host, port = address.rsplit(":", 1)
+    return f"{host}:{int(port) + _re_manager_shared_port_offset}"
+
+
+def _re_manager_shared_settings():
+    """
+    Returns the environment variables holding ZMQ addresses and the prefix for Redis keys used
+    by shared RE Manager and the test helpers. The settings are based on the current settings
+    for RE Managers started by the function-scoped fixtures.
+    """
+    ev_addresses = {
+        "QSERVER_ZMQ_CONTROL_ADDRESS_FOR_SERVER": "tcp://*:60615",
+        _name_ev_zmq_address: "tcp://localhost:60615",
+        # Status publishing is disabled if the addresses are not set
+        "QSERVER_ZMQ_STATUS_ADDRESS_FOR_SERVER": None,
+        _name_ev_zmq_status_address: None,
+    }
+    env = {}
+    for name, default in ev_addresses.items():
+        address = os.environ.get(name, default)
+        if address is not None:
+            env[name] = _re_manager_shared_address(address)
+    return env, f"{_test_redis_name_prefix}_shared"
+
+
+@contextlib.contextmanager
+def _re_manager_shared_context(settings):
+    """
+    Apply the settings returned by ``_re_manager_shared_settings`` for the duration of the context.
+    """
+    env, redis_name_prefix = settings
+    _manager_status_cache.invalidate()
+    try:
+        with pytest.MonkeyPatch.context() as mpatch:
+            for name, value in env.items():
+                mpatch.setenv(name, value)
+            mpatch.setattr(sys.modules[__name__], "_test_redis_name_prefix", redis_name_prefix)
+            yield
+    finally:
+        _manager_status_cache.invalidate()
+
+
+@pytest.fixture(scope="module")
+def _re_manager_shared_process():
+    """
+    Start shared RE Manager as a subprocess. Returns the tuple of the ``ReManager`` object and
+    the settings used to communicate with the manager.
+    """
+    settings = _re_manager_shared_settings()
+    failed_to_start = False
+    with _re_manager_shared_context(settings):
+        re = ReManager()
+
+        # Wait until RE Manager is started. Raise exception if the server failed to start.
+        if not wait_for_condition(time=10, condition=condition_manager_idle):
+            failed_to_start = True
+            re.kill_manager()
+            raise TimeoutError("Timeout: RE Manager failed to start.")
+
+        _reset_queue_mode()
+
+    yield re, settings
+
+    with _re_manager_shared_context(settings):
+        if not failed_to_start:
+            # Close the environment once at module teardown
+            status = get_manager_status()
+            if status["worker_environment_exists"]:
+                wait_for_condition(time=20, condition=condition_manager_idle)
+                resp, _ = zmq_secure_request("environment_close")
+                assert resp["success"] is True, pprint.pformat(resp)
+                assert wait_for_condition(time=5, condition=condition_environment_closed)
+            re.stop_manager()
+        else:
+            re.kill_manager()
+
+
+@pytest.fixture
+def re_manager_shared(_re_manager_shared_process):
+    """
+    Start RE Manager as a subprocess and share it between the tests of the module. The environment
+    opened by a test is not closed between the tests, which allows to avoid the cost of starting RE Manager
+    and opening the environment for each test. The tests are responsible for resetting the state
+    of RE Manager (e.g. clearing the queue and the history). The environment is closed and RE Manager
+    is stopped at module teardown. Shared RE Manager uses its own ZMQ ports (or IPC socket files) and
+    prefix for Redis keys, so the tests using the fixture may be mixed with the tests that start their
+    own RE Manager (e.g. using ``re_manager`` fixture). The test helpers communicate with shared RE Manager
+    only during the tests that use the fixture. Import ``_re_manager_shared_process`` along with the fixture.
+    """
+    re, settings = _re_manager_shared_process
+    with _re_manager_shared_context(settings):
+        yield re
+
+
 @pytest.fixture
 def reset_sys_modules():
     """
@@ -680,7 +1263,7 @@ class IPKernelClient:
         if self.ip_kernel_client:
             self.stop()
 
-        resp, _ = zmq_single_request("config_get")
+        resp, _ = zmq_secure_request("config_get")
         assert resp["success"] is True, pprint.pformat(resp)
         assert "config" in resp, pprint.pformat(resp)
         assert "ip_connect_info" in resp["config"], pprint.pformat(resp)
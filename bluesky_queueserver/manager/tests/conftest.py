@@ -3,6 +3,11 @@ import pytest
 from bluesky_queueserver.manager.profile_ops import clear_registered_items
 
 
+def pytest_configure(config):
+    # The marker is used by 'pytest-xdist' (--dist loadgroup). Register it in case the plugin is not installed.
+    config.addinivalue_line("markers", "xdist_group: tests in the group are run by the same pytest-xdist worker")
+
+
 @pytest.fixture(autouse=True)
 def setup_and_teardown_for_every_test():
     print("Clearing registered items ...")
@@ -8,6 +8,7 @@ import time as ttime
 
 import pytest
 import zmq
+import zmq.asyncio
 
 from bluesky_queueserver.manager.comms import (
     CommJsonRpcError,
@@ -16,9 +17,12 @@ from bluesky_queueserver.manager.comms import (
     PipeJsonRpcSendAsync,
     ZMQCommSendAsync,
     ZMQCommSendThreads,
+    close_shared_zmq_clients,
     generate_zmq_keys,
     generate_zmq_public_key,
     validate_zmq_key,
+    zmq_batch_request,
+    zmq_single_request,
 )
 from bluesky_queueserver.tests.common import format_jsonrpc_msg
 
@@ -483,6 +487,58 @@ def test_PipeJsonRpcReceive_8_failing(use_json):
     pc.stop()
 
 
+def test_PipeJsonRpcReceive_9_default_binary():
+    """
+    By default, the messages are sent over the pipe as Python objects (not encoded as JSON).
+    """
+
+    def method_handler1(*, value):
+        return {"value": value + 1}
+
+    conn1, conn2 = multiprocessing.Pipe()
+    pc = PipeJsonRpcReceive(conn=conn2)
+    pc.add_method(method_handler1, "method1")
+    pc.start()
+
+    request = format_jsonrpc_msg("method1", {"value": 5})
+    conn1.send(request)
+
+    assert conn1.poll(timeout=0.5), "Timeout occurred while waiting for response."
+    response = conn1.recv()
+    assert isinstance(response, dict), f"Response was encoded: {response!r}"
+    assert response == {"jsonrpc": "2.0", "id": request["id"], "result": {"value": 6}}
+
+    pc.stop()
+
+
+def test_PipeJsonRpcReceive_10_restart():
+    """
+    The pipe used to wake up the receiving thread is closed when the thread is stopped,
+    so repeated start/stop cycles do not leak file descriptors.
+    """
+
+    def method_handler1(*, value):
+        return {"value": value + 1}
+
+    conn1, conn2 = multiprocessing.Pipe()
+    pc = PipeJsonRpcReceive(conn=conn2)
+    pc.add_method(method_handler1, "method1")
+
+    for n in range(3):
+        pc.start()
+        wakeup_r, wakeup_w = pc._wakeup_r, pc._wakeup_w
+        assert not wakeup_r.closed and not wakeup_w.closed
+
+        request = format_jsonrpc_msg("method1", {"value": n})
+        conn1.send(request)
+        assert conn1.poll(timeout=0.5), "Timeout occurred while waiting for response."
+        assert conn1.recv()["result"] == {"value": n + 1}
+
+        pc.stop()
+        assert wakeup_r.closed and wakeup_w.closed
+        assert pc._wakeup_r is None and pc._wakeup_w is None
+
+
 # =======================================================================
 #                       Class PipeJsonRpcSendAsync
 
@@ -502,16 +558,19 @@ def test_PipeJsonRpcSendAsync_1(use_json):
 
         pc = PipeJsonRpcSendAsync(conn=conn1, name=new_name)
         pc.start()
-        assert count_threads_with_name(new_name) == 2, "One thread is expected to exist"
+        assert count_threads_with_name(new_name) == 1, "One thread is expected to exist"
+        assert pc._reader_registered is True
 
         pc.start()  # Expected to do nothing
 
         pc.stop()
         ttime.sleep(0.15)  # Wait until the thread stops (0.1s polling period)
         assert count_threads_with_name(new_name) == 0, "No threads are expected to exist"
+        assert pc._reader_registered is False
 
         pc.start()  # Restart
-        assert count_threads_with_name(new_name) == 2, "One thread is expected to exist"
+        assert count_threads_with_name(new_name) == 1, "One thread is expected to exist"
+        assert pc._reader_registered is True
         pc.stop()
 
     asyncio.run(object_start_stop())
@@ -600,7 +659,8 @@ def test_PipeJsonRpcSendAsync_2(method, params, result, notification, use_json):
 # fmt: on
 def test_PipeJsonRpcSendAsync_3(use_json):
     """
-    Put multiple messages to the loop at once. The should be processed one by one.
+    Put multiple messages to the loop at once. The messages are sent without waiting for
+    responses to the previous messages and processed by the server one by one.
     """
     n_calls = 0
     lock = threading.Lock()
@@ -622,11 +682,11 @@ def test_PipeJsonRpcSendAsync_3(use_json):
         p_send = PipeJsonRpcSendAsync(conn=conn1, name="comm-client", use_json=use_json)
         p_send.start()
 
-        # Submit multiple messages at once. Messages should stay at the event loop
-        #   and be processed one by one.
+        # Submit multiple messages at once. The server is processing messages one by one,
+        #   so the timeout must be sufficient to process all messages.
         futs = []
         for n in range(5):
-            futs.append(asyncio.ensure_future(p_send.send_msg("method1")))
+            futs.append(asyncio.ensure_future(p_send.send_msg("method1", timeout=2.0)))
 
         for n, fut in enumerate(futs):
             await asyncio.wait_for(fut, timeout=5.0)  # Timeout is in case of failure
@@ -639,6 +699,46 @@ def test_PipeJsonRpcSendAsync_3(use_json):
     pc.stop()
 
 
+# fmt: off
+@pytest.mark.parametrize("use_json", [False, True])
+# fmt: on
+def test_PipeJsonRpcSendAsync_3a_batch(use_json):
+    """
+    Send a batch of messages.
+    """
+
+    def method_handler1(value):
+        return value + 1
+
+    def method_handler2():
+        raise RuntimeError("Function crashed ...")
+
+    conn1, conn2 = multiprocessing.Pipe()
+    pc = PipeJsonRpcReceive(conn=conn2, name="comm-server", use_json=use_json)
+    pc.add_method(method_handler1, "method1")
+    pc.add_method(method_handler2, "method2")
+    pc.start()
+
+    async def send_messages():
+        p_send = PipeJsonRpcSendAsync(conn=conn1, name="comm-client", use_json=use_json)
+        p_send.start()
+
+        results = await p_send.send_batch([("method1", {"value": n}) for n in range(5)])
+        assert results == [1, 2, 3, 4, 5]
+
+        assert await p_send.send_batch([]) == []
+
+        with pytest.raises(CommJsonRpcError, match="Function crashed ..."):
+            await p_send.send_batch([("method1", [5]), ("method2", {})])
+
+        assert p_send._pending == {}
+
+        p_send.stop()
+
+    asyncio.run(send_messages())
+    pc.stop()
+
+
 # fmt: off
 @pytest.mark.parametrize("use_json", [False, True])
 # fmt: on
@@ -828,6 +928,41 @@ def test_PipeJsonRpcSendAsync_8_fail(use_json):
     pc.stop()
 
 
+# fmt: off
+@pytest.mark.parametrize("use_json", [False, True])
+# fmt: on
+def test_PipeJsonRpcSendAsync_9_msg_id(use_json):
+    """
+    Messages are assigned consecutive integer IDs.
+    """
+    conn1, conn2 = multiprocessing.Pipe()
+
+    def echo_msg_id():
+        # Respond to two messages. The result is the message ID.
+        for _ in range(2):
+            msg = conn2.recv()
+            msg = json.loads(msg) if use_json else msg
+            response = {"jsonrpc": "2.0", "id": msg["id"], "result": msg["id"]}
+            conn2.send(json.dumps(response) if use_json else response)
+
+    th = threading.Thread(target=echo_msg_id, daemon=True)
+    th.start()
+
+    async def send_messages():
+        p_send = PipeJsonRpcSendAsync(conn=conn1, name="comm-client", use_json=use_json)
+        p_send.start()
+
+        msg_id1 = await p_send.send_msg("method1", timeout=0.5)
+        msg_id2 = await p_send.send_msg("method1", timeout=0.5)
+        assert isinstance(msg_id1, int)
+        assert msg_id2 == msg_id1 + 1
+
+        p_send.stop()
+
+    asyncio.run(send_messages())
+    th.join(timeout=1)
+
+
 # =======================================================================
 #                               ZMQ keys
 
@@ -1241,6 +1376,23 @@ def test_ZMQCommSendThreads_6_fail():
         ZMQCommSendThreads(server_public_key="abc")
 
 
+def test_ZMQCommSendThreads_7_context_manager():
+    """
+    ZMQCommSendThreads used as context manager: the socket is closed on exit.
+    """
+    thread = threading.Thread(target=_zmq_server_1msg)
+    thread.start()
+
+    with ZMQCommSendThreads() as zmq_comm:
+        msg_recv = zmq_comm.send_message(method="testing", params={"p1": 10})
+        assert msg_recv["success"] is True, str(msg_recv)
+        zmq_socket = zmq_comm._zmq_socket
+        assert not zmq_socket.closed
+    assert zmq_socket.closed
+
+    thread.join()
+
+
 # =======================================================================
 #                       Class ZMQCommSendAsync
 
@@ -1306,12 +1458,11 @@ def test_ZMQCommSendAsync_2(encryption_enabled):
 # fmt: on
 def test_ZMQCommSendAsync_3(encryption_enabled):
     """
-    Testing protection of '_zmq_communicate` with lock. In this test the function
-    ``send_message` is called twice so that the second call is submitted before
-    the response to the first message is received. The server waits for 0.1 seconds
-    before responding to the 1st message to emulate delay in processing. Since
-    ``_zmq_communicate`` is protected by a lock, the second request will not
-    be sent until the first message is processed.
+    Concurrent requests. In this test the function ``send_message`` is called twice
+    so that the second call is submitted before the response to the first message
+    is received. The server waits for 0.1 seconds before responding to the 1st message
+    to emulate delay in processing. The second request is sent without waiting for
+    the response to the first request, the responses are received in the same order.
     """
     public_key, _, server_kwargs = _gen_server_keys(encryption_enabled=encryption_enabled)
 
@@ -1443,3 +1594,391 @@ def test_ZMQCommSendAsync_6_fail():
             ZMQCommSendAsync(server_public_key="abc")
 
     asyncio.run(testing())
+
+
+def test_ZMQCommSendAsync_7_shared_context():
+    """
+    ZMQ context is shared by all instances and is not terminated when the socket is closed.
+    """
+
+    async def testing():
+        zmq_comm1 = ZMQCommSendAsync()
+        zmq_comm2 = ZMQCommSendAsync()
+        assert zmq_comm1._ctx is zmq_comm2._ctx
+        assert zmq_comm1._ctx is zmq.asyncio.Context.instance()
+
+        zmq_comm1.close()
+        zmq_comm2.close()
+        assert not zmq.asyncio.Context.instance().closed
+
+    asyncio.run(testing())
+
+
+# fmt: off
+@pytest.mark.parametrize("zmq_server_address, keepalive", [
+    ("tcp://localhost:60615", 1),
+    ("ipc:///tmp/qserver_test_socket_options", -1),  # Default value
+])
+# fmt: on
+def test_ZMQCommSendAsync_8_socket_options(zmq_server_address, keepalive):
+    """
+    Options of the client socket.
+    """
+
+    async def testing():
+        zmq_comm = ZMQCommSendAsync(zmq_server_address=zmq_server_address)
+        assert zmq_comm._zmq_socket.getsockopt(zmq.SNDHWM) == 64
+        assert zmq_comm._zmq_socket.getsockopt(zmq.RCVHWM) == 64
+        assert zmq_comm._zmq_socket.getsockopt(zmq.TCP_KEEPALIVE) == keepalive
+        zmq_comm.close()
+
+    asyncio.run(testing())
+
+
+def test_ZMQCommSendAsync_9_concurrent():
+    """
+    Multiple concurrent requests: each request receives the response to the request.
+    """
+    n_msgs = 5
+
+    def _zmq_server_nmsg():
+        ctx = zmq.Context()
+        zmq_socket = ctx.socket(zmq.REP)
+        zmq_socket.bind("tcp://*:60615")
+        for n in range(n_msgs):
+            msg_in = zmq_socket.recv_json()
+            ttime.sleep(0.05)
+            zmq_socket.send_json({"success": True, "n": n, "msg_in": msg_in})
+        zmq_socket.close(linger=10)
+
+    thread = threading.Thread(target=_zmq_server_nmsg)
+    thread.start()
+
+    async def testing():
+        zmq_comm = ZMQCommSendAsync()
+        results = await asyncio.gather(
+            *[zmq_comm.send_message(method="testing", params={"value": n}) for n in range(n_msgs)]
+        )
+        for n, msg_recv in enumerate(results):
+            assert msg_recv["success"] is True, str(msg_recv)
+            assert msg_recv["n"] == n, str(msg_recv)
+            assert msg_recv["msg_in"] == {"method": "testing", "params": {"value": n}}, str(msg_recv)
+        zmq_comm.close()
+
+    asyncio.run(testing())
+
+    thread.join()
+
+
+def test_ZMQCommSendAsync_10_context_manager():
+    """
+    ZMQCommSendAsync used as asynchronous context manager: the socket is closed on exit.
+    """
+    thread = threading.Thread(target=_zmq_server_1msg)
+    thread.start()
+
+    async def testing():
+        async with ZMQCommSendAsync() as zmq_comm:
+            msg_recv = await zmq_comm.send_message(method="testing", params={"p1": 10})
+            assert msg_recv["success"] is True, str(msg_recv)
+            zmq_socket = zmq_comm._zmq_socket
+            assert not zmq_socket.closed
+        assert zmq_socket.closed
+
+    asyncio.run(testing())
+
+    thread.join()
+
+
+# fmt: off
+@pytest.mark.parametrize("batch_size", [None, 2])
+# fmt: on
+def test_ZMQCommSendAsync_11_batch(batch_size):
+    """
+    ``send_message_batch``: responses are returned in the order of the messages.
+    """
+    n_msgs = 5
+
+    def _zmq_server_nmsg():
+        ctx = zmq.Context()
+        zmq_socket = ctx.socket(zmq.REP)
+        zmq_socket.bind("tcp://*:60615")
+        for n in range(n_msgs):
+            msg_in = zmq_socket.recv_json()
+            zmq_socket.send_json({"success": True, "n": n, "msg_in": msg_in})
+        zmq_socket.close(linger=10)
+
+    thread = threading.Thread(target=_zmq_server_nmsg)
+    thread.start()
+
+    async def testing():
+        async with ZMQCommSendAsync() as zmq_comm:
+            messages = [("testing", {"value": n}) for n in range(n_msgs - 1)] + [("testing", None)]
+            results = await zmq_comm.send_message_batch(messages, batch_size=batch_size)
+            assert len(results) == n_msgs
+            for n, msg_recv in enumerate(results):
+                assert msg_recv["success"] is True, str(msg_recv)
+                assert msg_recv["n"] == n, str(msg_recv)
+                params_expected = {"value": n} if n < n_msgs - 1 else {}
+                assert msg_recv["msg_in"] == {"method": "testing", "params": params_expected}, str(msg_recv)
+
+            assert await zmq_comm.send_message_batch([]) == []
+
+    asyncio.run(testing())
+
+    thread.join()
+
+
+def test_ZMQCommSendAsync_12_concurrent_timeout():
+    """
+    Timeout of one of the concurrent requests: the socket is restarted and all pending requests fail.
+    The late responses are not returned to the requests sent after the socket is restarted.
+    """
+
+    def _zmq_server():
+        ctx = zmq.Context()
+        zmq_socket = ctx.socket(zmq.REP)
+        zmq_socket.bind("tcp://*:60615")
+        n = 0
+        while zmq_socket.poll(timeout=2000):
+            msg_in = zmq_socket.recv_json()
+            if n == 0:
+                ttime.sleep(0.5)  # Generate timeout for the 1st request
+            zmq_socket.send_json({"success": True, "n": n, "msg_in": msg_in})
+            n += 1
+        zmq_socket.close(linger=10)
+
+    thread = threading.Thread(target=_zmq_server)
+    thread.start()
+
+    async def testing():
+        async with ZMQCommSendAsync() as zmq_comm:
+            zmq_socket = zmq_comm._zmq_socket
+            msg1, msg2 = await asyncio.gather(
+                zmq_comm.send_message(method="testing", params={"value": 0}, timeout=100, raise_exceptions=False),
+                zmq_comm.send_message(method="testing", params={"value": 1}, timeout=5000, raise_exceptions=False),
+            )
+            assert msg1["success"] is False, str(msg1)
+            assert "timeout occurred" in msg1["msg"], str(msg1)
+            assert msg2["success"] is False, str(msg2)
+            assert "socket was restarted" in msg2["msg"], str(msg2)
+            assert zmq_comm._zmq_socket is not zmq_socket
+
+            msg3 = await zmq_comm.send_message(method="testing", params={"value": 2})
+            assert msg3["success"] is True, str(msg3)
+            assert msg3["msg_in"] == {"method": "testing", "params": {"value": 2}}, str(msg3)
+
+    asyncio.run(testing())
+
+    thread.join()
+
+
+def test_ZMQCommSendAsync_13_lost_request():
+    """
+    The server does not respond to one of the concurrent requests (e.g. the request is lost when
+    the server is restarted): the responses are matched to the requests by request ID and are
+    never returned to wrong requests.
+    """
+    n_msgs = 3
+
+    def _zmq_server():
+        ctx = zmq.Context()
+        zmq_socket = ctx.socket(zmq.ROUTER)
+        zmq_socket.bind("tcp://*:60615")
+        for n in range(n_msgs):
+            # Frames: client identity, request ID, empty delimiter, message
+            frames = zmq_socket.recv_multipart()
+            if n == 0:
+                continue  # The request is lost
+            msg_out = {"success": True, "n": n, "msg_in": json.loads(frames[-1])}
+            zmq_socket.send_multipart(frames[:-1] + [json.dumps(msg_out).encode("utf-8")])
+        zmq_socket.close(linger=100)
+
+    thread = threading.Thread(target=_zmq_server)
+    thread.start()
+
+    async def testing():
+        async with ZMQCommSendAsync() as zmq_comm:
+            results = await asyncio.gather(
+                *[
+                    zmq_comm.send_message(
+                        method="testing", params={"value": n}, timeout=1000, raise_exceptions=False
+                    )
+                    for n in range(n_msgs)
+                ]
+            )
+            assert results[0]["success"] is False, str(results[0])
+            assert "timeout occurred" in results[0]["msg"], str(results[0])
+            for n in range(1, n_msgs):
+                msg_recv = results[n]
+                assert msg_recv["success"] is True, str(msg_recv)
+                assert msg_recv["n"] == n, str(msg_recv)
+                assert msg_recv["msg_in"] == {"method": "testing", "params": {"value": n}}, str(msg_recv)
+
+    asyncio.run(testing())
+
+    thread.join()
+
+
+def test_ZMQCommSendAsync_14_batch_lost_request():
+    """
+    ``send_message_batch``: the server does not respond to one of the messages. The responses
+    returned for other messages are not shifted.
+    """
+    n_msgs = 3
+
+    def _zmq_server():
+        ctx = zmq.Context()
+        zmq_socket = ctx.socket(zmq.ROUTER)
+        zmq_socket.bind("tcp://*:60615")
+        for n in range(n_msgs):
+            # Frames: client identity, request ID, empty delimiter, message
+            frames = zmq_socket.recv_multipart()
+            if n == 1:
+                continue  # The request is lost
+            msg_out = {"success": True, "n": n, "msg_in": json.loads(frames[-1])}
+            zmq_socket.send_multipart(frames[:-1] + [json.dumps(msg_out).encode("utf-8")])
+        zmq_socket.close(linger=100)
+
+    thread = threading.Thread(target=_zmq_server)
+    thread.start()
+
+    async def testing():
+        async with ZMQCommSendAsync() as zmq_comm:
+            messages = [("testing", {"value": n}) for n in range(n_msgs)]
+            results = await zmq_comm.send_message_batch(messages, timeout=1000, raise_exceptions=False)
+            assert len(results) == n_msgs
+            for n, msg_recv in enumerate(results):
+                if n == 1:
+                    assert msg_recv["success"] is False, str(msg_recv)
+                    assert "timeout occurred" in msg_recv["msg"], str(msg_recv)
+                else:
+                    assert msg_recv["success"] is True, str(msg_recv)
+                    assert msg_recv["n"] == n, str(msg_recv)
+                    assert msg_recv["msg_in"] == {"method": "testing", "params": {"value": n}}, str(msg_recv)
+
+    asyncio.run(testing())
+
+    thread.join()
+
+
+# =======================================================================
+#                       Function zmq_single_request
+
+
+# fmt: off
+@pytest.mark.parametrize("encryption_enabled", [False, True])
+# fmt: on
+def test_zmq_single_request_1(encryption_enabled):
+    """
+    ``zmq_single_request``: the socket is reused by consecutive requests and closed
+    by ``close_shared_zmq_clients``.
+    """
+    public_key, _, server_kwargs = _gen_server_keys(encryption_enabled=encryption_enabled)
+
+    thread = threading.Thread(target=_zmq_server_2msg, kwargs=server_kwargs)
+    thread.start()
+
+    method, params = "testing", {"p1": 10, "p2": "abc"}
+
+    msg, msg_err = zmq_single_request(method, params, server_public_key=public_key)
+    assert msg_err == ""
+    assert msg["success"] is True, pprint.pformat(msg)
+    assert msg["some_data"] == 10
+    assert msg["msg_in"] == {"method": method, "params": params}
+
+    msg, msg_err = zmq_single_request(method, params, server_public_key=public_key)
+    assert msg_err == ""
+    assert msg["some_data"] == 20
+
+    thread.join()
+
+    close_shared_zmq_clients()
+    close_shared_zmq_clients()  # Expected to do nothing
+
+    # The server is not running
+    msg, msg_err = zmq_single_request(method, params, server_public_key=public_key, timeout=500)
+    assert msg is None
+    assert "timeout occurred" in msg_err
+
+    close_shared_zmq_clients()
+
+
+def test_zmq_single_request_2_threads():
+    """
+    ``zmq_single_request``: each thread uses a separate socket. Timeout of the request sent
+    by one thread does not cause failure of the pending request sent by another thread.
+    """
+
+    def _zmq_server():
+        ctx = zmq.Context()
+        zmq_socket = ctx.socket(zmq.REP)
+        zmq_socket.bind("tcp://*:60615")
+        n = 0
+        while zmq_socket.poll(timeout=2000):
+            msg_in = zmq_socket.recv_json()
+            if n == 0:
+                ttime.sleep(1)  # Generate timeout for the 1st request
+            zmq_socket.send_json({"success": True, "n": n, "msg_in": msg_in})
+            n += 1
+        zmq_socket.close(linger=10)
+
+    thread_server = threading.Thread(target=_zmq_server)
+    thread_server.start()
+
+    results = {}
+
+    def send_request(value, timeout):
+        results[value] = zmq_single_request("testing", {"value": value}, timeout=timeout)
+
+    th1 = threading.Thread(target=send_request, kwargs={"value": 1, "timeout": 200})
+    th2 = threading.Thread(target=send_request, kwargs={"value": 2, "timeout": 5000})
+    th1.start()
+    ttime.sleep(0.1)
+    th2.start()
+    th1.join()
+    th2.join()
+
+    msg1, msg_err1 = results[1]
+    assert msg1 is None
+    assert "timeout occurred" in msg_err1
+
+    msg2, msg_err2 = results[2]
+    assert msg_err2 == ""
+    assert msg2["success"] is True, pprint.pformat(msg2)
+    assert msg2["msg_in"] == {"method": "testing", "params": {"value": 2}}, pprint.pformat(msg2)
+
+    thread_server.join()
+
+    close_shared_zmq_clients()
+
+
+# =======================================================================
+#                       Function zmq_batch_request
+
+
+def test_zmq_batch_request_1():
+    """
+    ``zmq_batch_request``: basic test.
+    """
+    thread = threading.Thread(target=_zmq_server_2msg)
+    thread.start()
+
+    messages = [("testing", {"p1": 10}), ("testing", {"p1": 20})]
+
+    msgs, msg_err = zmq_batch_request(messages)
+    assert msg_err == ""
+    assert [_["some_data"] for _ in msgs] == [10, 20]
+    assert [_["msg_in"] for _ in msgs] == [
+        {"method": "testing", "params": {"p1": 10}},
+        {"method": "testing", "params": {"p1": 20}},
+    ]
+
+    thread.join()
+
+    # The server is not running
+    msgs, msg_err = zmq_batch_request(messages, timeout=500)
+    assert msgs is None
+    assert "timeout occurred" in msg_err
+
+    close_shared_zmq_clients()
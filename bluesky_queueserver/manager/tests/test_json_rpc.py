@@ -1,8 +1,9 @@
 import json
+from types import MappingProxyType
 
 import pytest
 
-from ..json_rpc import JSONRPCResponseManager
+from ..json_rpc import JSONRPCResponseManager, json_dumps, json_dumps_bytes, json_loads
 
 
 # fmt: off
@@ -36,11 +37,16 @@ def _method4():
     raise RuntimeError("Error in 'method4'")
 
 
+def _method5(a):
+    raise TypeError(f"Error in 'method5': {a}")
+
+
 methods = {
     "method1": _method1,
     "method2": _method2,
     "method3": _method3,
     "method4": _method4,
+    "method5": _method5,
 }
 
 
@@ -110,6 +116,18 @@ methods = {
      {"jsonrpc": "2.0", "id": 1, "error":
       {"code": -32000, "message": "Server error", "data":
        {"type": "RuntimeError", "message": "Error in 'method4'"}}}),
+    ({"jsonrpc": "2.0", "method": "method5", "params": [10], "id": 1},  # 'TypeError' raised by the method
+     {"jsonrpc": "2.0", "id": 1, "error":
+      {"code": -32000, "message": "Server error", "data":
+       {"type": "TypeError", "message": "Error in 'method5': 10"}}}),
+    ({"jsonrpc": "2.0", "method": "method5", "params": [], "id": 1},  # Missing param 'a'
+     {"jsonrpc": "2.0", "id": 1, "error":
+      {"code": -32602, "message": "Invalid params", "data":
+       {"type": "TypeError",
+        "message": (
+            "Invalid params in the message {'jsonrpc': '2.0', 'method': 'method5', 'params': "
+            "[], 'id': 1}: _method5() missing 1 required positional argument: 'a'")
+        }}}),
 
     # Errors in batches of messages
     ([{"jsonrpc": "2.0", "method": "unknown", "id": 2},
@@ -144,6 +162,12 @@ def test_json_rpc_corrupt_message():
     """
     rm = JSONRPCResponseManager(use_json=True)
     msg = "{'json_rpc}"
+
+    # The error message depends on the package used for decoding JSON ('orjson' or 'json')
+    with pytest.raises(ValueError) as ex_info:
+        json_loads(msg)
+    err_msg = str(ex_info.value)
+
     resp = rm.handle(msg)
     resp = json.loads(resp)
     assert resp == {
@@ -154,10 +178,51 @@ def test_json_rpc_corrupt_message():
             "message": "Parse error",
             "data": {
                 "type": "TypeError",
-                "message": (
-                    "Failed to parse the message '{'json_rpc}': Expecting property name "
-                    "enclosed in double quotes: line 1 column 2 (char 1)"
-                ),
+                "message": f"Failed to parse the message '{{'json_rpc}}': {err_msg}",
             },
         },
     }
+
+
+# fmt: off
+@pytest.mark.parametrize("obj", [
+    {},
+    [],
+    {"jsonrpc": "2.0", "method": "method1", "params": {"a": 10, "b": [1, 2.5, "abc"]}, "id": 1},
+    [{"jsonrpc": "2.0", "method": "method2", "params": [10], "id": "some-id"}, {"c": None, "d": True}],
+    {"text": "Non-ASCII characters: \u00b5m"},
+])
+# fmt: on
+def test_json_rpc_json_dumps_loads(obj):
+    """
+    ``json_dumps``, ``json_dumps_bytes`` and ``json_loads`` produce the same results as the standard
+    ``json`` module regardless of whether ``orjson`` is installed.
+    """
+    msg = json_dumps(obj)
+    assert isinstance(msg, str)
+    assert json.loads(msg) == obj
+    assert json_loads(msg) == obj
+    assert json_loads(json.dumps(obj)) == obj
+
+    msg_bytes = json_dumps_bytes(obj)
+    assert isinstance(msg_bytes, bytes)
+    assert json.loads(msg_bytes) == obj
+    assert json_loads(msg_bytes) == obj
+    assert json_loads(memoryview(msg_bytes)) == obj
+
+
+def test_json_rpc_json_dumps_mapping():
+    """
+    ``json_dumps`` and ``json_dumps_bytes``: read-only mappings are encoded as dictionaries,
+    unsupported types raise ``TypeError``.
+    """
+    obj = {"item": MappingProxyType({"name": "count", "kwargs": MappingProxyType({"num": 5})}), "user": "abc"}
+    obj_expected = {"item": {"name": "count", "kwargs": {"num": 5}}, "user": "abc"}
+
+    assert json.loads(json_dumps(obj)) == obj_expected
+    assert json.loads(json_dumps_bytes(obj)) == obj_expected
+
+    with pytest.raises(TypeError):
+        json_dumps({"a": object()})
+    with pytest.raises(TypeError):
+        json_dumps_bytes({"a": object()})
@@ -1,6 +1,6 @@
 import pytest
 
-from bluesky_queueserver.manager.manager import RunEngineManager
+from bluesky_queueserver.manager.manager import RunEngineManager, _zmq_handlers
 
 
 # fmt: off
@@ -21,3 +21,13 @@ def test_check_request_for_unsupported_params_1(request_dict, param_names, succe
     else:
         with pytest.raises(ValueError, match=msg):
             RunEngineManager._check_request_for_unsupported_params(request=request_dict, param_names=param_names)
+
+
+def test_zmq_handlers_1():
+    """
+    Check that each method in ``_zmq_handlers`` is classified as read-only or not and
+    that the handler for each method is implemented by ``RunEngineManager``.
+    """
+    for method, (handler_name, read_only) in _zmq_handlers.items():
+        assert isinstance(read_only, bool), f"Method {method!r} is not classified as read-only or not"
+        assert callable(getattr(RunEngineManager, handler_name, None)), f"No handler for method {method!r}"
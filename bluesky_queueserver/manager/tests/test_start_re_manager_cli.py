@@ -1,12 +1,15 @@
 import copy
 import getpass
+import json
 import os
 import pprint
 import re
 import subprocess
+import time as ttime
 
 import pytest
 import yaml
+import zmq
 
 from bluesky_queueserver import gen_list_of_plans_and_devices
 from bluesky_queueserver.manager.config import default_existing_pd_fln, default_user_group_pd_fln
@@ -228,6 +231,83 @@ def test_start_re_manager_console_output_2(monkeypatch, re_manager_cmd, test_mod
         assert "RE Environment is ready" not in streamed_stdout
 
 
+# fmt: off
+@pytest.mark.parametrize("test_mode", ["none", "parameter", "env_var"])
+# fmt: on
+def test_start_re_manager_status_publishing_1(monkeypatch, re_manager_cmd, test_mode):  # noqa: F811
+    """
+    Check that RE Manager publishes its status and results of completed tasks if the address
+    is set using ``--zmq-status-addr`` parameter or ``QSERVER_ZMQ_STATUS_ADDRESS_FOR_SERVER``
+    environment variable. Publishing of the status is disabled by default.
+    """
+    address_status_server = "tcp://*:60631"
+    address_status_client = "tcp://localhost:60631"
+
+    params_server = []
+    if test_mode == "none":
+        # Publishing is disabled
+        success = False
+    elif test_mode == "parameter":
+        success = True
+        params_server.append(f"--zmq-status-addr={address_status_server}")
+    elif test_mode == "env_var":
+        success = True
+        monkeypatch.setenv("QSERVER_ZMQ_STATUS_ADDRESS_FOR_SERVER", address_status_server)
+    else:
+        raise RuntimeError(f"Unrecognized test mode '{test_mode}'")
+
+    re_manager_cmd(params_server)
+
+    ctx = zmq.Context()
+    socket = ctx.socket(zmq.SUB)
+    socket.connect(address_status_client)
+    socket.subscribe("QS_Status")
+    socket.subscribe("QS_TaskResult")
+
+    try:
+        zmq_single_request("environment_open")
+        assert wait_for_condition(time=timeout_env_open, condition=condition_environment_created)
+
+        resp, _ = zmq_single_request("script_upload", params={"script": "a = 10"})
+        assert resp["success"] is True, pprint.pformat(resp)
+        task_uid = resp["task_uid"]
+        result = wait_for_task_result(10, task_uid)
+        assert result["success"] is True, pprint.pformat(result)
+
+        zmq_single_request("environment_close")
+        assert wait_for_condition(time=3, condition=condition_environment_closed)
+
+        manager_states, task_results = [], []
+        while socket.poll(timeout=100):
+            topic, payload = socket.recv_multipart()
+            if topic == b"QS_Status":
+                manager_states.append(json.loads(payload)["manager_state"])
+            else:
+                task_results.append(json.loads(payload))
+
+        # The status is published once the queue is changed (before it is republished periodically)
+        resp, _ = zmq_single_request("queue_item_add", {"item": _plan1, "user": _user, "user_group": _user_group})
+        assert resp["success"] is True, pprint.pformat(resp)
+        items_in_queue, t_stop = None, ttime.time() + 0.5
+        while (items_in_queue != 1) and socket.poll(timeout=max(int((t_stop - ttime.time()) * 1000), 0)):
+            topic, payload = socket.recv_multipart()
+            items_in_queue = json.loads(payload)["items_in_queue"]
+    finally:
+        socket.close(linger=0)
+        ctx.term()
+
+    if success:
+        assert "creating_environment" in manager_states, manager_states
+        assert "closing_environment" in manager_states, manager_states
+        assert manager_states[-1] == "idle", manager_states
+        assert task_results == [{"task_uid": task_uid, "result": result}], pprint.pformat(task_results)
+        assert items_in_queue == 1
+    else:
+        assert manager_states == []
+        assert task_results == []
+        assert items_in_queue is None
+
+
 # fmt: off
 @pytest.mark.parametrize("option", ["unchanged", "add_plan", "add_device", "add_plan_device"])
 @pytest.mark.parametrize("update_existing_plans_devices", ["NEVER", "ENVIRONMENT_OPEN", "ALWAYS"])
@@ -502,6 +582,7 @@ def _get_expected_settings_default_1(tmpdir):
         "zmq_info_addr": "tcp://*:60625",
         "zmq_private_key": None,
         "zmq_publish_console": False,
+        "zmq_status_addr": None,
     }
 
 
@@ -516,6 +597,7 @@ network:
   zmq_private_key: {0}
   zmq_info_addr: tcp://*:60627
   zmq_publish_console: true
+  zmq_status_addr: tcp://*:60637
   redis_addr: localhost:6379
   redis_name_prefix: qs_unit_tests2
 worker:
@@ -595,6 +677,7 @@ def _get_expected_settings_config_2(file_dir):
         "zmq_info_addr": "tcp://*:60627",
         "zmq_private_key": "Ue=.po0aQ9.}<Xvrny+f{V04XMc6JZ9ufKf5aeFy",
         "zmq_publish_console": True,
+        "zmq_status_addr": "tcp://*:60637",
     }
 
 
@@ -624,6 +707,7 @@ def _get_cli_params_3(file_dir):
         "--databroker-config=NEW",
         "--zmq-info-addr=tcp://*:60629",
         "--zmq-publish-console=OFF",
+        "--zmq-status-addr=tcp://*:60639",
         "--console-output=OFF",
     ]
 
@@ -677,6 +761,7 @@ def _get_expected_settings_params_3(file_dir):
         "zmq_info_addr": "tcp://*:60629",
         "zmq_private_key": "Ue=.po0aQ9.}<Xvrny+f{V04XMc6JZ9ufKf5aeFy",
         "zmq_publish_console": False,
+        "zmq_status_addr": "tcp://*:60639",
     }
 
 